@@ -28,6 +28,14 @@ TOTAL_PARTS = 91
 DOWNLOAD_DIR = os.path.abspath("google_takeout_downloads")
 MANAGE_URL = f"https://takeout.google.com/manage/archive/{ARCHIVE_ID}"
 
+# Pipeline mode: extract each part as soon as its download has finished,
+# while the other parts are still downloading (settings from extract_takeout.py)
+PIPELINE_EXTRACT = False
+PIPELINE_POLL_SECONDS = 10
+# Also start extracting a part while it is still downloading (needs
+# PARALLEL_WORKERS = 1 in extract_takeout.py)
+STREAM_PARTIAL_DOWNLOADS = False
+
 class DownloadMonitor:
     """Monitor download directory"""
     
@@ -53,6 +61,61 @@ class DownloadMonitor:
         
         return None
     
+    def get_partial_files(self):
+        """Get list of downloads still in progress"""
+        pattern = os.path.join(self.download_dir, "*.crdownload")
+        return glob.glob(pattern)
+    
+    def find_partial_file_by_index(self, index):
+        """Find a download in progress for this index"""
+        index_str = f"{index:03d}"
+        for partial_file in self.get_partial_files():
+            basename = os.path.basename(partial_file)
+            pattern = rf'takeout-.*-{index_str}(?:\s*\(\d+\))?\.zip\.crdownload$'
+            if re.search(pattern, basename):
+                return partial_file
+        return None
+    
+    def wait_for_completed_parts(self, indices, poll_interval=10, stream_partial=False):
+        """Yield (index, path) for each part as soon as it is fully downloaded
+        
+        A part counts as finished when its final .zip exists, no partial
+        file for it is left and its size did not change since the last check.
+        With stream_partial, when no finished part is waiting, the lowest
+        part still downloading is yielded with its .crdownload path.
+        """
+        waiting = set(indices)
+        last_sizes = {}
+        
+        while waiting:
+            partial = {os.path.basename(p) for p in self.get_partial_files()}
+            found = False
+            
+            for index in sorted(waiting):
+                zip_file = self.find_existing_file_by_index(index)
+                if not zip_file or os.path.basename(zip_file) + ".crdownload" in partial:
+                    continue
+                
+                size = os.path.getsize(zip_file)
+                if last_sizes.get(index) == size:
+                    waiting.discard(index)
+                    found = True
+                    yield index, zip_file
+                else:
+                    last_sizes[index] = size
+            
+            if stream_partial and not found:
+                for index in sorted(waiting):
+                    partial_file = self.find_partial_file_by_index(index)
+                    if partial_file:
+                        waiting.discard(index)
+                        found = True
+                        yield index, partial_file
+                        break
+            
+            if waiting and not found:
+                time.sleep(poll_interval)
+    
     def get_file_info(self, filepath):
         """Get information about a file"""
         if not os.path.exists(filepath):
@@ -343,6 +406,37 @@ class TakeoutDownloader:
         
         return clicked
     
+    def extract_while_downloading(self, start_index, end_index):
+        """Feed each part into the extractor as soon as its download is done"""
+        from extract_takeout import create_extractor
+        
+        extractor = create_extractor(self.download_dir)
+        extractor.output_folder.mkdir(parents=True, exist_ok=True)
+        indices = range(start_index, end_index + 1)
+        
+        print("="*70)
+        print("⚡ PIPELINE: extracting parts as they finish downloading")
+        print("="*70)
+        print(f"📂 Output folder: {extractor.output_folder}")
+        print(f"🔧 Duplicate mode: {extractor.duplicate_mode}")
+        print("   Press Ctrl+C to stop waiting for downloads\n")
+        
+        stream = STREAM_PARTIAL_DOWNLOADS and extractor.workers == 1
+        
+        def finished_parts():
+            for index, zip_file in self.monitor.wait_for_completed_parts(
+                    indices, PIPELINE_POLL_SECONDS, stream_partial=stream):
+                if zip_file.endswith(".crdownload"):
+                    print(f"\n[{index:2d}] ⬇️  Still downloading: {os.path.basename(zip_file)}", flush=True)
+                else:
+                    print(f"\n[{index:2d}] ✓ Download complete: {os.path.basename(zip_file)}", flush=True)
+                yield Path(zip_file)
+        
+        start_time = datetime.now()
+        extractor.extract_as_available(finished_parts())
+        elapsed = (datetime.now() - start_time).total_seconds()
+        extractor.print_summary(len(indices), elapsed)
+    
     def run(self):
         """Main download process"""
         print("="*70)
@@ -415,10 +509,14 @@ class TakeoutDownloader:
                 print(f"   • This may take a while depending on file sizes and your internet speed")
                 print("\n" + "="*70 + "\n")
             
-            # Keep browser open
-            print("⏸️  Browser will stay open to monitor downloads.")
-            print("   Press ENTER when all downloads are complete to close browser...")
-            input()
+            if PIPELINE_EXTRACT:
+                # Extract finished parts while the rest keep downloading
+                self.extract_while_downloading(start_index, end_index)
+            else:
+                # Keep browser open
+                print("⏸️  Browser will stay open to monitor downloads.")
+                print("   Press ENTER when all downloads are complete to close browser...")
+                input()
             
             # Final summary
             elapsed = time.time() - start_time
@@ -7,9 +7,33 @@ Smart duplicate handling, progress bars, verification
 import os
 import zipfile
 import shutil
+import fnmatch
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import threading
 import hashlib
+import sqlite3
+import struct
+import errno
+import time
+import zlib
+import re
+import sys
+import json
+import mmap
+import uuid
+from array import array
+from bisect import bisect_left
+
+from sidecar_store import SidecarStore, is_sidecar, media_name_for, photo_taken_time
+from hash_cache import HashCache
+from hashing import hash_file
+
+try:
+    import fcntl  # Reflinks (Linux)
+except ImportError:
+    fcntl = None
 
 # Configuration
 ZIP_FOLDER = "google_takeout_downloads"  # Folder containing your ZIP files
@@ -22,40 +46,1488 @@ OUTPUT_FOLDER = r"E:\Takeout"  # Where to extract (Windows path)
 # "overwrite" - Overwrite existing files (not recommended)
 DUPLICATE_MODE = "skip"
 
+# Parallel extraction:
+# Number of worker processes extracting whole ZIP parts at the same time.
+# 1 = one ZIP at a time. Parts are scheduled largest first (by compressed size).
+PARALLEL_WORKERS = 1
+
+# Threads extracting members of the same ZIP at once (each has its own ZIP handle).
+# 1 = one member at a time. Helps most with large ZIPs full of big videos.
+MEMBER_THREADS = 1
+MAX_INFLIGHT_MB = 512  # Upper bound on member bytes being written at once
+
+HASH_BUFFER_SIZE = 1024 * 1024  # Read size when checksumming existing files
+
+# Uncompressed (stored) members such as MP4/JPG are copied by the kernel
+# straight from the ZIP into the output file where the OS supports it
+# (Linux copy_file_range / sendfile). The CRC32 is still checked. If the
+# kernel refuses, the normal path is used for the rest of the run.
+FAST_STORED_COPY = True
+
+# Read ZIP members through a memory map of the ZIP instead of buffered
+# reads: uncompressed data is used in place, compressed data goes straight
+# to zlib, and the OS is told to read ahead. Off = plain zipfile reads.
+MMAP_READS = True
+
+# Reserve the full size of large output files before writing them (Linux
+# posix_fallocate), so they are not grown piece by piece and end up less
+# fragmented. 0 = off. On filesystems without native support the C library
+# emulates this by touching every block - turn it off there.
+PREALLOCATE_MIN_MB = 64
+
+# Checksum file:
+# Hash every extracted file while it is being written and list the results
+# in OUTPUT_FOLDER/checksums-<date>.<algorithm>, in the format of md5sum,
+# sha256sum and b2sum (check later with e.g. "b2sum -c checksums-...blake2b").
+# None = off, "md5" = compatible, "blake2b" = faster on 64-bit CPUs, "sha256"
+CHECKSUM_ALGORITHM = None
+
+# Content deduplication:
+# Takeout stores the same photo in album and year folders, and parts overlap.
+# Files with the same size and CRC32 as a file already written in this run
+# (confirmed with a strong hash) become links to it instead of a full copy.
+# None = off, "auto" = reflink (independent copy sharing disk blocks; Btrfs,
+# XFS) where supported, else hardlink, "reflink" or "hardlink" = only that.
+# Note: hardlinked files are the same file - editing one changes all of them.
+DEDUP_CONTENT = None
+
+# Photo metadata store:
+# Google Photos puts a small .json file next to every photo. Instead of
+# writing tens of thousands of them, store them in one database,
+# OUTPUT_FOLDER/takeout_sidecars.sqlite, searchable by date, place and album
+# (see sidecar_store.py). Album metadata.json files are still written.
+SIDECAR_STORE = False
+
+# Photo dates:
+# Set the modified date of each extracted photo/video to when it was taken
+# (photoTakenTime from its .json sidecar), right after it is written,
+# instead of the extraction time. Large numbers of sidecars are read by
+# all CPU cores at once.
+APPLY_PHOTO_DATES = False
+
+# Resume support:
+# Record every finished member in a SQLite manifest next to OUTPUT_FOLDER
+# (e.g. E:\Takeout.manifest.sqlite). Reruns skip recorded members without
+# touching the output folder. Delete the manifest to force a full re-check.
+# A small marker file in OUTPUT_FOLDER ties the manifest to it: if the
+# output folder is deleted or emptied, the records are cleared automatically.
+USE_MANIFEST = True
+OUTPUT_MARKER = ".takeout_manifest_id"
+
+# Hash cache:
+# The CRC32 of files already on disk (duplicate checks in "compare" mode,
+# routes and collision planning) is remembered in a cache shared with
+# organize_videos.py (~/.takeout_hash_cache.sqlite, see hash_cache.py).
+# Unchanged files are not read again on the next run.
+USE_HASH_CACHE = True
+
+# Incremental import (monthly refresh):
+# Every imported file is also recorded by path, size and CRC32 in the
+# manifest. With this on, files that are unchanged since an earlier import
+# are not extracted again - only new and changed ones are.
+# Changed files meet the old version on disk and follow DUPLICATE_MODE.
+INCREMENTAL_IMPORT = False
+REPORT_DELETIONS = True  # List files no longer in the export (nothing is deleted)
+
+# Collision planning:
+# Read the directories of all ZIPs first and decide every output path
+# (including _copyN names) in memory before anything is written.
+PLAN_COLLISIONS = True
+
+# The directories of all ZIPs are cached in this file inside ZIP_FOLDER
+# (about 100 bytes per file), so planning and takeout_view.py reopen instantly.
+MEMBER_INDEX_FILE = ".takeout_index.bin"
+
+# Pre-flight check ("python extract_takeout.py verify [--full]"):
+# Processes used to check the ZIPs before extracting. 0 = one per CPU core.
+# The --full check decompresses everything and is split into chunks of this size.
+VERIFY_WORKERS = 0
+VERIFY_CHUNK_MB = 512
+
+# Routing (extract and organize in one pass):
+# Files matching a route are written straight into its destination folder
+# (flat, like organize_videos.py) instead of OUTPUT_FOLDER, so they are not
+# copied a second time later. Patterns match the file name; a pattern with
+# "/" matches the whole path inside the ZIP. Policies for a name that already
+# exists in the destination, as in organize_videos.py: "skip", "rename",
+# "overwrite" ("identical" = same size and CRC32).
+ROUTES = []
+# Example:
+# ROUTES = [
+#     {'patterns': ['*.mp4', '*.mov'], 'dest': r"E:\My Videos",
+#      'identical': "skip", 'different': "rename"},
+# ]
+
+class ByteBudget:
+    """Bound the number of bytes in flight between threads"""
+    
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self.cond = threading.Condition()
+    
+    def acquire(self, size):
+        # A member larger than the whole budget waits until nothing else is running
+        size = min(size, self.limit)
+        with self.cond:
+            while self.used and self.used + size > self.limit:
+                self.cond.wait()
+            self.used += size
+        return size
+    
+    def release(self, size):
+        with self.cond:
+            self.used -= size
+            self.cond.notify_all()
+
+class ExtractionManifest:
+    """SQLite record of extracted members, used to resume interrupted runs"""
+    
+    def __init__(self, db_path, output_folder=None, batch_size=1000):
+        self.db_path = Path(db_path)
+        self.output_folder = Path(output_folder) if output_folder else None
+        self.batch_size = batch_size
+        self.cleared = False  # Records were dropped because the output folder changed
+        self.conn = None
+        self.pending = []
+        self.imported = []
+        # Worker processes inherit this, so one run has one id
+        self.run_id = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    
+    def __getstate__(self):
+        # Each worker process opens its own connection
+        state = self.__dict__.copy()
+        state['conn'] = None
+        state['pending'] = []
+        state['imported'] = []
+        return state
+    
+    def connect(self):
+        """Open the database, creating the table on first use"""
+        if self.conn is None:
+            self.conn = sqlite3.connect(str(self.db_path), timeout=60)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS members (
+                    part TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    crc INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    final_path TEXT NOT NULL,
+                    action TEXT NOT NULL,
+                    PRIMARY KEY (part, name, offset)
+                )
+            """)
+            # Content of earlier imports by path inside the ZIP, independent
+            # of the part file names (which change with every export)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS imported (
+                    name TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    crc INTEGER NOT NULL,
+                    run TEXT NOT NULL,
+                    PRIMARY KEY (name, size, crc)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+            self.conn.commit()
+            if self.output_folder is not None:
+                self.check_output_folder()
+        return self.conn
+    
+    def check_output_folder(self):
+        """Drop all records if they belong to a different or emptied output folder
+        
+        The same random id is kept in the manifest and in a marker file in
+        the output folder. A missing or different marker means the files
+        recorded here are no longer there.
+        """
+        marker = self.output_folder / OUTPUT_MARKER
+        try:
+            found = marker.read_text().strip()
+        except OSError:
+            found = None
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'output_id'").fetchone()
+        if row is not None and row[0] == found:
+            return
+        
+        has_records = self.conn.execute(
+            "SELECT EXISTS (SELECT 1 FROM members) OR EXISTS (SELECT 1 FROM imported)").fetchone()[0]
+        output_id = found if row is None and found else uuid.uuid4().hex
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+        if output_id != found:
+            marker.write_text(output_id + "\n")
+        with self.conn:
+            if has_records:
+                self.conn.execute("DELETE FROM members")
+                self.conn.execute("DELETE FROM imported")
+                self.cleared = True
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('output_id', ?)", (output_id,))
+    
+    def completed_members(self, part):
+        """Members of a ZIP part finished in earlier runs
+        
+        Returns {(name, header offset): (crc, size)}.
+        """
+        rows = self.connect().execute(
+            "SELECT name, offset, crc, size FROM members WHERE part = ?", (part,))
+        return {(name, offset): (crc, size) for name, offset, crc, size in rows}
+    
+    def imported_members(self):
+        """{(name, size, crc)} imported by earlier runs"""
+        rows = self.connect().execute(
+            "SELECT name, size, crc FROM imported WHERE run != ?", (self.run_id,))
+        return set(rows)
+    
+    def was_imported(self, name, size, crc):
+        """Whether an earlier run imported this exact member (primary key lookup)"""
+        row = self.connect().execute(
+            "SELECT 1 FROM imported WHERE name = ? AND size = ? AND crc = ? AND run != ?",
+            (name, size, crc, self.run_id)).fetchone()
+        return row is not None
+    
+    def imported_names(self):
+        """Paths inside the ZIPs that earlier runs imported"""
+        rows = self.connect().execute(
+            "SELECT DISTINCT name FROM imported WHERE run != ?", (self.run_id,))
+        return {name for (name,) in rows}
+    
+    def forget_imported(self, names):
+        """Drop paths that are no longer in the export"""
+        conn = self.connect()
+        with conn:
+            conn.executemany("DELETE FROM imported WHERE name = ?", ((n,) for n in names))
+    
+    def record(self, part, member, final_path, action):
+        """Queue a finished member, written in batches"""
+        self.pending.append((part, member.filename, member.header_offset, member.CRC,
+                             member.file_size, str(final_path), action))
+        self.mark_imported(member)
+    
+    def mark_imported(self, member):
+        """Queue a member as imported by this run"""
+        self.imported.append((member.filename, member.file_size, member.CRC, self.run_id))
+        if len(self.imported) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """Commit queued records in one transaction"""
+        if not self.pending and not self.imported:
+            return
+        conn = self.connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO members VALUES (?, ?, ?, ?, ?, ?, ?)", self.pending)
+            conn.executemany(
+                "INSERT OR REPLACE INTO imported VALUES (?, ?, ?, ?)", self.imported)
+        self.pending = []
+        self.imported = []
+    
+    def close(self):
+        self.flush()
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+# Selective extraction:
+# Only extract what matches. Checked against the ZIP directory, so files
+# that are filtered out are never decompressed or written.
+# Empty list / None = no restriction.
+FILTERS = {
+    'include_services': [],    # e.g. ["Google Photos"] (folder under Takeout/)
+    'exclude_services': [],    # e.g. ["Mail", "Drive"]
+    'include_patterns': [],    # e.g. ["*/Photos from 2023/*"] (path inside the ZIP)
+    'exclude_patterns': [],
+    'include_extensions': [],  # e.g. [".jpg", ".mp4"]
+    'exclude_extensions': [],  # e.g. [".json"]
+    'min_size_mb': None,
+    'max_size_mb': None,
+}
+
+class MemberFilter:
+    """Include/exclude rules for ZIP members, using only directory information"""
+    
+    def __init__(self, include_services=None, exclude_services=None,
+                 include_patterns=None, exclude_patterns=None,
+                 include_extensions=None, exclude_extensions=None,
+                 min_size_mb=None, max_size_mb=None):
+        lower = lambda values: [v.lower() for v in values or []]
+        self.include_services = lower(include_services)
+        self.exclude_services = lower(exclude_services)
+        self.include_patterns = lower(include_patterns)
+        self.exclude_patterns = lower(exclude_patterns)
+        self.include_extensions = [e if e.startswith('.') else '.' + e for e in lower(include_extensions)]
+        self.exclude_extensions = [e if e.startswith('.') else '.' + e for e in lower(exclude_extensions)]
+        self.min_size = min_size_mb * 1024**2 if min_size_mb is not None else None
+        self.max_size = max_size_mb * 1024**2 if max_size_mb is not None else None
+    
+    def is_active(self):
+        return any([self.include_services, self.exclude_services, self.include_patterns,
+                    self.exclude_patterns, self.include_extensions, self.exclude_extensions,
+                    self.min_size is not None, self.max_size is not None])
+    
+    @staticmethod
+    def service(name):
+        """Takeout service of a member, e.g. "google photos" """
+        parts = name.split('/')
+        if len(parts) > 2 and parts[0].lower() == 'takeout':
+            return parts[1]
+        return parts[0] if len(parts) > 1 else ''
+    
+    def matches_name(self, name):
+        name = name.lower()
+        service = self.service(name)
+        if self.include_services and service not in self.include_services:
+            return False
+        if service in self.exclude_services:
+            return False
+        if self.include_patterns and not any(fnmatch.fnmatchcase(name, p) for p in self.include_patterns):
+            return False
+        if any(fnmatch.fnmatchcase(name, p) for p in self.exclude_patterns):
+            return False
+        extension = os.path.splitext(name)[1]
+        if self.include_extensions and extension not in self.include_extensions:
+            return False
+        if extension in self.exclude_extensions:
+            return False
+        return True
+    
+    def matches_size(self, size):
+        if self.min_size is not None and size < self.min_size:
+            return False
+        if self.max_size is not None and size > self.max_size:
+            return False
+        return True
+    
+    def matches(self, member):
+        return self.matches_name(member.filename) and self.matches_size(member.file_size)
+
+ROUTE_POLICIES = ("skip", "rename", "overwrite")
+
+def check_routes(routes):
+    """Validate a ROUTES table, returns it with Path destinations"""
+    checked = []
+    for route in routes:
+        for key in ('identical', 'different'):
+            if route.get(key, "skip") not in ROUTE_POLICIES:
+                raise ValueError(f"Route policy must be one of {ROUTE_POLICIES}, got {route[key]!r}")
+        checked.append({
+            'patterns': [p.lower() for p in route['patterns']],
+            'dest': Path(route['dest']),
+            'identical': route.get('identical', "skip"),
+            'different': route.get('different', "rename"),
+        })
+    return checked
+
+def match_route(routes, member_name):
+    """First route whose patterns match a member, or None"""
+    name = member_name.lower()
+    base = name.rsplit('/', 1)[-1]
+    for route in routes:
+        for pattern in route['patterns']:
+            if fnmatch.fnmatchcase(name if '/' in pattern else base, pattern):
+                return route
+    return None
+
+def local_data_offset(member, header):
+    """Position of a member's data in the ZIP, from the 30 bytes of its local header"""
+    if len(header) != 30 or header[:4] != b'PK\x03\x04':
+        raise zipfile.BadZipFile(f"Bad local file header for {member.filename}")
+    name_length, extra_length = struct.unpack('<HH', header[26:30])
+    return member.header_offset + 30 + name_length + extra_length
+
+class MappedZip:
+    """Read-only memory map of a local ZIP part
+    
+    Stored members are returned as memoryview slices of the map (no copy),
+    deflated members are decompressed straight from it. The CRC32 and size
+    are checked like ZipFile does.
+    """
+    
+    def __init__(self, zip_path):
+        with open(zip_path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self.map, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            self.map.madvise(mmap.MADV_SEQUENTIAL)  # Aggressive readahead
+        self.view = memoryview(self.map)
+    
+    @staticmethod
+    def supports(member):
+        return (member.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+                and not member.flag_bits & 0x1)
+    
+    def data_range(self, member):
+        """(start, end) of a member's data, from its local header"""
+        start = local_data_offset(member, self.view[member.header_offset:member.header_offset + 30])
+        end = start + member.compress_size
+        if end > len(self.view):
+            raise zipfile.BadZipFile(f"Truncated data for {member.filename}")
+        return start, end
+    
+    def chunks(self, member, chunk_size=HASH_BUFFER_SIZE):
+        """Uncompressed data of a member, in chunks of about chunk_size"""
+        start, end = self.data_range(member)
+        crc = 0
+        size = 0
+        if member.compress_type == zipfile.ZIP_STORED:
+            for pos in range(start, end, chunk_size):
+                chunk = self.view[pos:min(pos + chunk_size, end)]
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                yield chunk
+        else:
+            inflater = zlib.decompressobj(-15)
+            for pos in range(start, end, chunk_size):
+                data = inflater.decompress(self.view[pos:min(pos + chunk_size, end)], chunk_size)
+                while data:
+                    crc = zlib.crc32(data, crc)
+                    size += len(data)
+                    yield data
+                    # Bound memory for highly compressible data
+                    data = inflater.decompress(inflater.unconsumed_tail, chunk_size)
+            data = inflater.flush()
+            if data:
+                crc = zlib.crc32(data, crc)
+                size += len(data)
+                yield data
+        if crc != member.CRC or size != member.file_size:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {member.filename!r}")
+    
+    def close(self):
+        try:
+            self.view.release()
+            self.map.close()
+        except BufferError:
+            pass  # A chunk is still referenced - freed with it
+
+class PartPlan:
+    """Planned actions of one ZIP part, looked up by header offset
+    
+    Three typed arrays instead of a dict of paths: the output path follows
+    from the member (target_for) and, for renamed files, the _copyN number.
+    """
+    
+    ACTIONS = (None, "new", "renamed", "skipped", "overwrite", "superseded")
+    
+    def __init__(self, offsets, codes, copies):
+        self.offsets = offsets  # Header offsets, ascending
+        self.codes = codes      # Index into ACTIONS
+        self.copies = copies    # _copyN number of renamed members
+    
+    def __len__(self):
+        return len(self.offsets)
+    
+    def lookup(self, header_offset):
+        """(action, _copyN number) of the member at header_offset"""
+        i = bisect_left(self.offsets, header_offset)
+        if i == len(self.offsets) or self.offsets[i] != header_offset:
+            raise KeyError(header_offset)
+        return self.ACTIONS[self.codes[i]], self.copies[i]
+    
+    def counts(self):
+        """{action: number of members}"""
+        counts = {}
+        for code in self.codes:
+            action = self.ACTIONS[code]
+            counts[action] = counts.get(action, 0) + 1
+        return counts
+
+class CollisionPlanner:
+    """Resolve every output path of a run in memory, before writing
+    
+    Only ZIP central directories are read. Each output directory is listed
+    once; after that existence checks and _copyN numbers come from memory.
+    The result follows the same rules, in the same ZIP order, as deciding
+    one file at a time during extraction. Decisions are kept in typed
+    arrays by MemberIndex position; a planned file costs one name in its
+    directory's listing.
+    """
+    
+    def __init__(self, output_folder, duplicate_mode, file_crc32, target_for, index):
+        self.output_folder = Path(output_folder)
+        self.duplicate_mode = duplicate_mode
+        self.file_crc32 = file_crc32
+        self.target_for = target_for  # member -> (path, route or None)
+        self.index = index            # MemberIndex being planned (sizes and CRCs)
+        self.listings = {}   # directory -> {name: DirEntry, or position of the member writing it}
+        self.disk_crc = {}   # path -> CRC32 of a file already on disk, once compared
+        self.next_copy = {}  # (directory, stem, suffix) -> next _copy number to try
+        self.codes = array('B', [0]) * len(index)   # PartPlan.ACTIONS index, 0 = not planned
+        self.copies = array('I', [0]) * len(index)  # _copyN number of renamed members
+        self.directories = set()  # Output folders that files will be written to
+    
+    @staticmethod
+    def key(path):
+        # Match the filesystem's idea of "same name" (case-insensitive on Windows)
+        return os.path.normcase(str(path))
+    
+    @staticmethod
+    def copy_path(path, counter):
+        return path.parent / f"{path.stem}_copy{counter}{path.suffix}"
+    
+    def read_listing(self, directory):
+        """{name: DirEntry} of a directory on disk"""
+        names = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    names[os.path.normcase(entry.name)] = entry
+        except OSError:
+            pass  # Directory does not exist yet
+        return names
+    
+    def listing(self, directory):
+        """Names in an output directory, read from disk only once"""
+        dir_key = self.key(directory)
+        names = self.listings.get(dir_key)
+        if names is None:
+            names = self.listings[dir_key] = self.read_listing(directory)
+        return names
+    
+    def existing(self, path):
+        """DirEntry of a file on disk, position of the member planned to write it, or None"""
+        return self.listing(path.parent).get(os.path.normcase(path.name))
+    
+    def size_of(self, found):
+        if isinstance(found, int):
+            return self.index.columns['file_size'][found]
+        return found.stat().st_size
+    
+    def crc_of(self, path, found):
+        if isinstance(found, int):
+            return self.index.columns['CRC'][found]
+        path_key = self.key(path)
+        crc = self.disk_crc.get(path_key)
+        if crc is None:
+            crc = self.disk_crc[path_key] = self.file_crc32(path)
+        return crc
+    
+    def identical(self, path, found, member):
+        return (self.size_of(found) == member.file_size
+                and self.crc_of(path, found) == member.CRC)
+    
+    def renamed_counter(self, target_path):
+        """Next free _copyN number, without probing the disk for each N"""
+        copy_key = (self.key(target_path.parent), target_path.stem, target_path.suffix)
+        counter = self.next_copy.get(copy_key, 1)
+        while self.existing(self.copy_path(target_path, counter)) is not None:
+            counter += 1
+        self.next_copy[copy_key] = counter + 1
+        return counter
+    
+    def decide(self, target_path, found, member, route=None):
+        """Same rules as TakeoutExtractor.handle_duplicate, returns (action, _copyN number)"""
+        if route is not None:
+            identical = self.identical(target_path, found, member)
+            policy = route['identical'] if identical else route['different']
+            if policy == "rename":
+                return "renamed", self.renamed_counter(target_path)
+            elif policy == "overwrite":
+                return "overwrite", 0
+            return "skipped", 0
+        
+        if self.duplicate_mode == "skip":
+            if self.size_of(found) == member.file_size:
+                return "skipped", 0
+            return "renamed", self.renamed_counter(target_path)
+        
+        elif self.duplicate_mode == "rename":
+            return "renamed", self.renamed_counter(target_path)
+        
+        elif self.duplicate_mode == "compare":
+            if self.identical(target_path, found, member):
+                return "skipped", 0
+            return "renamed", self.renamed_counter(target_path)
+        
+        elif self.duplicate_mode == "overwrite":
+            return "overwrite", 0
+        
+        return "skipped", 0
+    
+    def add(self, position, member):
+        """Plan the member at a MemberIndex position, in ZIP order"""
+        target_path, route = self.target_for(member)
+        found = self.existing(target_path)
+        if found is None:
+            action, counter = "new", 0
+        else:
+            action, counter = self.decide(target_path, found, member, route)
+        
+        self.codes[position] = PartPlan.ACTIONS.index(action)
+        if action == "skipped":
+            return
+        final_path = target_path
+        if action == "renamed":
+            self.copies[position] = counter
+            final_path = self.copy_path(target_path, counter)
+        elif action == "overwrite" and isinstance(found, int):
+            # Written earlier in this run and replaced now - write it only once
+            self.codes[found] = PartPlan.ACTIONS.index("superseded")
+        self.listing(final_path.parent)[os.path.normcase(final_path.name)] = position
+        self.directories.add(final_path.parent)
+    
+    def decision(self, position):
+        """(action, _copyN number) planned for a MemberIndex position"""
+        return PartPlan.ACTIONS[self.codes[position]], self.copies[position]
+    
+    def part_plan(self, part):
+        """PartPlan of the planned members of one part"""
+        offsets = self.index.columns['header_offset']
+        positions = [i for i in self.index.part_range(part) if self.codes[i]]
+        positions.sort(key=offsets.__getitem__)
+        return PartPlan(array('Q', [offsets[i] for i in positions]),
+                        array('B', [self.codes[i] for i in positions]),
+                        array('I', [self.copies[i] for i in positions]))
+
+FICLONE = 0x40049409  # Linux ioctl: make a file share another file's blocks
+# Link errors caused by one pair of files, not by the filesystem
+LINK_ERRORS_TO_RETRY = (errno.EXDEV, errno.EMLINK, errno.ENOENT)
+
+class ContentIndex:
+    """Files written in this run by (size, CRC32), for linking identical content"""
+    
+    def __init__(self, link_mode, algorithm="blake2b"):
+        if link_mode not in ("auto", "reflink", "hardlink"):
+            raise ValueError(f"Unknown DEDUP_CONTENT: {link_mode!r}")
+        self.link_mode = link_mode
+        self.algorithm = algorithm
+        self.can_reflink = link_mode != "hardlink" and fcntl is not None
+        self.can_hardlink = link_mode != "reflink" and hasattr(os, 'link')
+        self.written = {}  # (size, crc) -> (path, digest) of the first copy
+        self.keys = {}     # path -> (size, crc)
+        self.lock = threading.Lock()
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['lock'] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+    
+    def new_hasher(self):
+        return hashlib.new(self.algorithm)
+    
+    def lookup(self, size, crc):
+        with self.lock:
+            return self.written.get((size, crc))
+    
+    def add(self, path, size, crc, digest):
+        """Remember a fully written file as the copy to link to"""
+        with self.lock:
+            if (size, crc) not in self.written:
+                self.written[(size, crc)] = (path, digest)
+                self.keys[path] = (size, crc)
+    
+    def forget(self, path):
+        """A remembered file is about to be replaced"""
+        with self.lock:
+            key = self.keys.pop(path, None)
+            if key is not None:
+                del self.written[key]
+    
+    def reflink(self, source_path, target_path):
+        with open(source_path, 'rb') as source, open(target_path, 'wb') as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+    
+    def link(self, source_path, target_path):
+        """Make target_path a link to source_path, returns "reflink", "hardlink" or None"""
+        if self.can_reflink:
+            try:
+                self.reflink(source_path, target_path)
+                return "reflink"
+            except OSError as e:
+                try:
+                    target_path.unlink()
+                except OSError:
+                    pass
+                if e.errno not in LINK_ERRORS_TO_RETRY:
+                    self.can_reflink = False  # Filesystem cannot share blocks
+        if self.can_hardlink:
+            try:
+                os.link(source_path, target_path)
+                return "hardlink"
+            except OSError as e:
+                if e.errno not in LINK_ERRORS_TO_RETRY:
+                    self.can_hardlink = False  # e.g. FAT/exFAT
+        return None
+
+class MemberIndex:
+    """Central directories of all ZIP parts, in a few flat arrays
+    
+    File names share one UTF-8 buffer, the other fields are parallel typed
+    arrays, so millions of members cost ~100 bytes each instead of a
+    ZipInfo object each. Saved indexes are memory-mapped, not parsed.
+    Only file entries are kept (no directories), in ZIP order, part by part.
+    """
+    
+    MAGIC = b"TKINDEX1"
+    FIELDS = (('header_offset', 'Q'), ('compress_size', 'Q'), ('file_size', 'Q'),
+              ('CRC', 'I'), ('dos_time', 'I'),
+              ('part', 'H'), ('compress_type', 'H'), ('flag_bits', 'H'))
+    
+    def __init__(self, fingerprint, columns, name_ends, names, part_ends, errors, mapped=None):
+        self.fingerprint = fingerprint  # [[ZIP name, size, mtime_ns], ...]
+        self.columns = columns          # field -> array or memoryview
+        self.name_ends = name_ends      # end of member i's name in names
+        self.names = names
+        self.part_ends = part_ends      # members of part p: part_ends[p-1] .. part_ends[p]
+        self.errors = errors            # ZIPs that could not be read
+        self.mapped = mapped
+    
+    @staticmethod
+    def fingerprint_of(zip_files):
+        result = []
+        for zip_path in zip_files:
+            st = Path(zip_path).stat()
+            result.append([Path(zip_path).name, st.st_size, st.st_mtime_ns])
+        return result
+    
+    @classmethod
+    def build(cls, zip_files):
+        """Read every central directory, one ZIP at a time"""
+        columns = {field: array(code) for field, code in cls.FIELDS}
+        name_ends = array('Q')
+        names = bytearray()
+        part_ends = array('Q')
+        errors = []
+        for number, zip_path in enumerate(zip_files):
+            try:
+                with zipfile.ZipFile(zip_path, 'r') as zf:
+                    for m in zf.filelist:
+                        if m.is_dir():
+                            continue
+                        year, month, day, hour, minute, second = m.date_time
+                        dos_date = (max(year - 1980, 0) << 9) | (month << 5) | day
+                        dos_time = (hour << 11) | (minute << 5) | (second // 2)
+                        columns['header_offset'].append(m.header_offset)
+                        columns['compress_size'].append(m.compress_size)
+                        columns['file_size'].append(m.file_size)
+                        columns['CRC'].append(m.CRC)
+                        columns['dos_time'].append((dos_date << 16) | dos_time)
+                        columns['part'].append(number)
+                        columns['compress_type'].append(m.compress_type)
+                        columns['flag_bits'].append(m.flag_bits)
+                        names += m.filename.encode('utf-8')
+                        name_ends.append(len(names))
+            except Exception as e:
+                errors.append(f"Error reading {Path(zip_path).name}: {e}")
+            part_ends.append(len(name_ends))
+        return cls(cls.fingerprint_of(zip_files), columns, name_ends, bytes(names),
+                   part_ends, errors)
+    
+    @classmethod
+    def open(cls, zip_files, cache_path):
+        """Load the cached index if it matches zip_files, else build and cache it"""
+        cache_path = Path(cache_path)
+        index = cls.load(cache_path)
+        if index is not None and index.fingerprint == cls.fingerprint_of(zip_files):
+            return index
+        if index is not None:
+            index.close()
+        
+        index = cls.build(zip_files)
+        try:
+            index.save(cache_path)
+        except OSError:
+            pass  # Read-only ZIP folder - keep the index in memory
+        return index
+    
+    def save(self, path):
+        """Write the index: magic, header length, JSON header, 8-byte aligned arrays"""
+        sections = [(field, self.columns[field]) for field, _ in self.FIELDS]
+        sections += [('name_ends', self.name_ends), ('part_ends', self.part_ends)]
+        header = {'fingerprint': self.fingerprint, 'errors': self.errors,
+                  'byteorder': sys.byteorder, 'count': len(self.name_ends),
+                  'sections': {}}
+        
+        # Offsets depend on the header length, so lay out sections relative to the data start
+        position = 0
+        for name, values in sections:
+            header['sections'][name] = [position, values.typecode, len(values)]
+            position += (len(values) * values.itemsize + 7) // 8 * 8
+        header['sections']['names'] = [position, 'B', len(self.names)]
+        
+        encoded = json.dumps(header).encode('utf-8')
+        encoded += b' ' * (-(len(self.MAGIC) + 8 + len(encoded)) % 8)
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(self.MAGIC + struct.pack('<Q', len(encoded)) + encoded)
+            for name, values in sections:
+                data = values.tobytes() if isinstance(values, array) else bytes(values)
+                f.write(data + b'\0' * (-len(data) % 8))
+            f.write(self.names)
+        os.replace(temp_path, path)
+    
+    @classmethod
+    def load(cls, path):
+        """Memory-map a saved index, or None if missing or unusable"""
+        try:
+            with open(path, 'rb') as f:
+                if f.read(len(cls.MAGIC)) != cls.MAGIC:
+                    return None
+                header_length = struct.unpack('<Q', f.read(8))[0]
+                header = json.loads(f.read(header_length))
+                if header['byteorder'] != sys.byteorder:
+                    return None
+                data_start = len(cls.MAGIC) + 8 + header_length
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+        
+        view = memoryview(mapped)
+        sections = {}
+        for name, (offset, code, count) in header['sections'].items():
+            start = data_start + offset
+            size = count * array(code).itemsize
+            sections[name] = view[start:start + size].cast(code) if code != 'B' else view[start:start + size]
+        columns = {field: sections[field] for field, _ in cls.FIELDS}
+        return cls(header['fingerprint'], columns, sections['name_ends'], sections['names'],
+                   sections['part_ends'], header['errors'], mapped)
+    
+    def close(self):
+        """Release the memory map (members already returned stay valid)"""
+        if self.mapped is not None:
+            for values in [*self.columns.values(), self.name_ends, self.names, self.part_ends]:
+                values.release()
+            self.mapped.close()
+            self.mapped = None
+    
+    def __len__(self):
+        return len(self.name_ends)
+    
+    def part_range(self, part):
+        """Positions of the members of one part"""
+        return range(self.part_ends[part - 1] if part else 0, self.part_ends[part])
+    
+    def name(self, i):
+        start = self.name_ends[i - 1] if i else 0
+        return bytes(self.names[start:self.name_ends[i]]).decode('utf-8')
+    
+    def member(self, i):
+        """ZipInfo for position i, enough for ZipFile.open and the planner"""
+        packed = self.columns['dos_time'][i]
+        dos_date, dos_time = packed >> 16, packed & 0xFFFF
+        info = zipfile.ZipInfo(self.name(i), (
+            (dos_date >> 9) + 1980, max((dos_date >> 5) & 0xF, 1), max(dos_date & 0x1F, 1),
+            dos_time >> 11, (dos_time >> 5) & 0x3F, (dos_time & 0x1F) * 2))
+        info.header_offset = self.columns['header_offset'][i]
+        info.compress_size = self.columns['compress_size'][i]
+        info.file_size = self.columns['file_size'][i]
+        info.CRC = self.columns['CRC'][i]
+        info.compress_type = self.columns['compress_type'][i]
+        info.flag_bits = self.columns['flag_bits'][i]
+        return info
+    
+    def members(self, part):
+        """ZipInfo objects of one part, created one at a time"""
+        for i in self.part_range(part):
+            yield self.member(i)
+
+class ChecksumManifest:
+    """Checksum file in md5sum/sha256sum format, filled while extracting
+    
+    Digests are kept by path until close(), so a file written more than
+    once in a run (overwrite mode) is listed once, with its final digest.
+    Worker processes write their own shard next to the file; the shards are
+    merged into it when the main process closes the manifest.
+    """
+    
+    def __init__(self, path, algorithm, root):
+        hashlib.new(algorithm)  # Fail early on an unknown algorithm
+        self.path = Path(path)
+        self.algorithm = algorithm
+        self.root = Path(root)
+        self.owner_pid = os.getpid()
+        self.entries = {}  # path relative to the output -> digest, last write wins
+        self.lock = threading.Lock()
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['entries'] = {}
+        state['lock'] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+    
+    def new_hasher(self):
+        return hashlib.new(self.algorithm)
+    
+    def shard_path(self):
+        if os.getpid() == self.owner_pid:
+            return self.path
+        return self.path.with_name(f"{self.path.name}.{os.getpid()}")
+    
+    def add(self, file_path, digest):
+        """Remember the digest of a file just written"""
+        try:
+            name = Path(file_path).relative_to(self.root).as_posix()
+        except ValueError:
+            name = Path(file_path).as_posix()  # Routed outside the output folder
+        with self.lock:
+            self.entries[name] = digest
+    
+    @staticmethod
+    def format_line(name, digest):
+        """<digest>, two spaces, path relative to the output"""
+        if '\\' in name or '\n' in name:
+            # Same escaping as coreutils: leading backslash, then \\ and \n
+            name = name.replace('\\', '\\\\').replace('\n', '\\n')
+            return f"\\{digest}  {name}\n"
+        return f"{digest}  {name}\n"
+    
+    @staticmethod
+    def parse_line(line):
+        """(name, digest) of a line written by format_line"""
+        line = line.rstrip('\n')
+        escaped = line.startswith('\\')
+        digest, _, name = line[escaped:].partition('  ')
+        if escaped:
+            name = re.sub(r'\\(.)', lambda m: '\n' if m.group(1) == 'n' else m.group(1), name)
+        return name, digest
+    
+    def write(self, path, entries, mode):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, mode, encoding='utf-8', newline='\n') as f:
+            for name, digest in entries.items():
+                f.write(self.format_line(name, digest))
+    
+    def close(self):
+        with self.lock:
+            if os.getpid() != self.owner_pid:
+                # A worker process may run several parts - append to its shard
+                if self.entries:
+                    self.write(self.shard_path(), self.entries, 'a')
+                    self.entries = {}
+                return
+            # Collect worker shards; the main process writes shared members
+            # after the workers, so its own entries win
+            shards = [p for p in self.path.parent.glob(self.path.name + ".*")
+                      if p.suffix[1:].isdigit()]
+            for shard in sorted(shards):
+                with open(shard, 'r', encoding='utf-8', newline='\n') as f:
+                    for line in f:
+                        name, digest = self.parse_line(line)
+                        self.entries.setdefault(name, digest)
+                shard.unlink()
+            if self.entries:
+                self.write(self.path, self.entries, 'w')
+
+class StreamedMember:
+    """One member found by StreamingZipReader; read it with chunks() or skip()"""
+    
+    def __init__(self, reader, info, data_start, zip64):
+        self.reader = reader
+        self.info = info
+        self.data_start = data_start
+        self.zip64 = zip64
+        self.has_descriptor = bool(info.flag_bits & 0x08)
+        self.end = None  # Offset of the next local header, once known
+    
+    def chunks(self):
+        """Yield the member's uncompressed data as it arrives, checking its CRC"""
+        reader = self.reader
+        info = self.info
+        pos = self.data_start
+        crc = 0
+        size = 0
+        
+        if info.compress_type == zipfile.ZIP_STORED:
+            remaining = info.compress_size
+            while remaining:
+                data = reader.read(pos, min(HASH_BUFFER_SIZE, remaining), exact=False)
+                pos += len(data)
+                remaining -= len(data)
+                crc = zlib.crc32(data, crc)
+                size += len(data)
+                yield data
+        else:
+            # Raw deflate knows where it ends, even without sizes in the header
+            inflater = zlib.decompressobj(-15)
+            while not inflater.eof:
+                limit = HASH_BUFFER_SIZE
+                if not self.has_descriptor:
+                    limit = min(limit, self.data_start + info.compress_size - pos)
+                    if limit <= 0:
+                        raise zipfile.BadZipFile(f"Truncated data for {info.filename}")
+                data = reader.read(pos, limit, exact=False)
+                pos += len(data)
+                out = inflater.decompress(data)
+                if out:
+                    crc = zlib.crc32(out, crc)
+                    size += len(out)
+                    yield out
+            pos -= len(inflater.unused_data)
+        
+        if self.has_descriptor:
+            # [signature] crc32, compressed size, uncompressed size
+            if reader.read(pos, 4) == b'PK\x07\x08':
+                pos += 4
+            layout = '<IQQ' if self.zip64 else '<III'
+            length = struct.calcsize(layout)
+            info.CRC, info.compress_size, info.file_size = struct.unpack(
+                layout, reader.read(pos, length))
+            pos += length
+        
+        if crc != info.CRC or size != info.file_size:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename!r}")
+        self.end = pos
+    
+    def skip(self):
+        """Move past the member without extracting it"""
+        if self.has_descriptor:
+            # The end is only known by inflating the data
+            for _ in self.chunks():
+                pass
+        else:
+            self.end = self.data_start + self.info.compress_size
+
+class StreamingZipReader:
+    """Walk the local file headers of a ZIP that is still being downloaded
+    
+    Members are yielded as soon as their data has arrived. The file is only
+    open while reading, so the browser can rename the partial download to
+    its final name when it is done. Reading stops (stopped_at is set) at a
+    member that cannot be streamed: encrypted, an unusual compression
+    method, or stored with a data descriptor (its end is unknown).
+    """
+    
+    LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')
+    
+    def __init__(self, partial_path, final_path, poll_interval=1.0):
+        self.partial_path = Path(partial_path)
+        self.final_path = Path(final_path)
+        self.poll_interval = poll_interval
+        self.stopped_at = None
+    
+    def is_complete(self):
+        return not self.partial_path.exists() and self.final_path.exists()
+    
+    def wait_until_complete(self):
+        while not self.is_complete():
+            time.sleep(self.poll_interval)
+    
+    def read(self, offset, size, exact=True):
+        """Read bytes at offset, waiting for them to be downloaded
+        
+        With exact=False, returns as soon as at least one byte is there.
+        """
+        needed = size if exact else 1
+        while True:
+            complete = self.is_complete()
+            for path in (self.partial_path, self.final_path):
+                try:
+                    with open(path, 'rb') as f:
+                        available = os.fstat(f.fileno()).st_size - offset
+                        if available >= needed:
+                            f.seek(offset)
+                            data = f.read(min(size, available))
+                            if len(data) >= needed:
+                                return data
+                    break
+                except FileNotFoundError:
+                    continue  # Renamed just now - try the other name
+            if complete:
+                raise EOFError(f"{self.final_path.name} ends before byte {offset + needed}")
+            time.sleep(self.poll_interval)
+    
+    def members(self):
+        """Yield a StreamedMember for each file, in archive order"""
+        pos = 0
+        while True:
+            (signature, _, flags, method, dos_time, dos_date, crc, compress_size,
+             file_size, name_length, extra_length) = self.LOCAL_HEADER.unpack(self.read(pos, 30))
+            if signature != b'PK\x03\x04':
+                if signature[:2] != b'PK':
+                    raise zipfile.BadZipFile(f"Bad local file header at byte {pos}")
+                return  # Central directory reached
+            
+            tail = self.read(pos + 30, name_length + extra_length) if name_length + extra_length else b''
+            raw_name = tail[:name_length]
+            extra = tail[name_length:]
+            name = raw_name.decode('utf-8' if flags & 0x800 else 'cp437')
+            
+            # ZIP64 sizes live in extra field 0x0001
+            zip64 = False
+            i = 0
+            while i + 4 <= len(extra):
+                tag, length = struct.unpack('<HH', extra[i:i + 4])
+                if tag == 0x0001:
+                    zip64 = True
+                    values = list(struct.unpack(f'<{length // 8}Q', extra[i + 4:i + 4 + length // 8 * 8]))
+                    if file_size == 0xFFFFFFFF and values:
+                        file_size = values.pop(0)
+                    if compress_size == 0xFFFFFFFF and values:
+                        compress_size = values.pop(0)
+                i += 4 + length
+            
+            date_time = ((dos_date >> 9) + 1980, max((dos_date >> 5) & 0xF, 1), max(dos_date & 0x1F, 1),
+                         dos_time >> 11, (dos_time >> 5) & 0x3F, (dos_time & 0x1F) * 2)
+            info = zipfile.ZipInfo(name, date_time)
+            info.flag_bits = flags
+            info.compress_type = method
+            info.CRC = crc
+            info.compress_size = compress_size
+            info.file_size = file_size
+            info.header_offset = pos
+            
+            if (flags & 0x01 or method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+                    or (flags & 0x08 and method == zipfile.ZIP_STORED)):
+                self.stopped_at = pos
+                return
+            
+            member = StreamedMember(self, info, pos + 30 + name_length + extra_length, zip64)
+            yield member
+            if member.end is None:
+                member.skip()
+            pos = member.end
+
+def takeout_index(zip_path):
+    """Takeout part number from the file name (takeout-...-004.zip -> 4), or None"""
+    match = re.search(r'-(\d+)(?:\s*\(\d+\))?\.zip$', Path(zip_path).name)
+    return int(match.group(1)) if match else None
+
+def _check_structure_worker(zip_path, chunk_bytes):
+    """Cheap check of one part: end of central directory, member offsets, local headers
+    
+    Returns (problems, chunks); chunks are (first, last) member positions for a full check.
+    """
+    try:
+        file_size = os.path.getsize(zip_path)
+        with zipfile.ZipFile(zip_path, 'r') as zf:
+            members = zf.filelist
+            problems = []
+            data_end = zf.start_dir
+            if data_end > file_size:
+                problems.append("central directory points past the end of the file")
+            for m in members:
+                if m.header_offset + 30 + m.compress_size > data_end:
+                    problems.append(f"{m.filename}: data runs past the central directory")
+            
+            # First and last local headers must be where the central directory says
+            if members and not problems:
+                with open(zip_path, 'rb') as f:
+                    for m in {min(members, key=lambda m: m.header_offset),
+                              max(members, key=lambda m: m.header_offset)}:
+                        f.seek(m.header_offset)
+                        if f.read(4) != b'PK\x03\x04':
+                            problems.append(f"{m.filename}: no local header at offset {m.header_offset}")
+            
+            chunks = []
+            first, size = 0, 0
+            for i, m in enumerate(members):
+                size += m.compress_size
+                if size >= chunk_bytes:
+                    chunks.append((first, i + 1))
+                    first, size = i + 1, 0
+            if first < len(members):
+                chunks.append((first, len(members)))
+            return problems, chunks
+    except (zipfile.BadZipFile, OSError) as e:
+        return [f"not a complete ZIP (truncated download?): {e}"], []
+
+def _check_members_worker(zip_path, first, last):
+    """Decompress members [first, last) of a part and check their CRC32"""
+    problems = []
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        try:
+            mapped = MappedZip(zip_path)
+        except (OSError, ValueError):
+            mapped = None
+        for m in zf.filelist[first:last]:
+            if m.is_dir():
+                continue
+            try:
+                if mapped is not None and MappedZip.supports(m):
+                    for _ in mapped.chunks(m):
+                        pass
+                else:
+                    with zf.open(m) as f:
+                        while f.read(HASH_BUFFER_SIZE):
+                            pass
+            except Exception as e:
+                problems.append(f"{m.filename}: {e}")
+        if mapped is not None:
+            mapped.close()
+    return problems
+
+def _read_photo_times_worker(zip_path, names):
+    """Parse sidecars of one ZIP, returns {sidecar name: taken time}"""
+    times = {}
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        for name in names:
+            try:
+                taken = photo_taken_time(json.loads(zf.read(name)))
+            except (ValueError, KeyError, zipfile.BadZipFile):
+                continue  # Unreadable sidecar - the file keeps its extraction date
+            if taken is not None:
+                times[name] = taken
+    return times
+
+def _extract_part_worker(extractor, zip_path, skip_names, plan=None):
+    """Extract one ZIP part in a worker process
+    
+    Returns its stats and the photos/sidecars it could not pair up.
+    """
+    extractor.verbose = False
+    try:
+        extractor.extract_with_merge(zip_path, skip_names, plan)
+    finally:
+        if extractor.manifest:
+            extractor.manifest.close()
+        if extractor.checksums:
+            extractor.checksums.close()
+        if extractor.sidecars:
+            extractor.sidecars.close()
+        if extractor.hash_cache:
+            extractor.hash_cache.close()
+    return extractor.stats, extractor.undated, extractor.photo_times
+
 class TakeoutExtractor:
-    def __init__(self, zip_folder, output_folder, duplicate_mode="skip"):
+    def __init__(self, zip_folder, output_folder, duplicate_mode="skip", workers=1,
+                 threads=1, max_inflight_mb=512, use_manifest=False,
+                 plan_collisions=False, fast_stored_copy=False, checksum_algorithm=None,
+                 routes=None, filters=None, dedup=None, incremental=False,
+                 list_deletions=False, preallocate_mb=0, sidecar_store=False,
+                 photo_dates=False, mmap_reads=False, hash_cache=False):
         self.zip_folder = Path(zip_folder)
         self.output_folder = Path(output_folder)
         self.duplicate_mode = duplicate_mode
-        self.stats = {
+        self.workers = max(1, workers)
+        self.threads = max(1, threads)
+        self.max_inflight = max_inflight_mb * 1024**2
+        self.plan_collisions = plan_collisions
+        self.routes = check_routes(routes or [])
+        self.filter = MemberFilter(**(filters or {}))
+        if not self.filter.is_active():
+            self.filter = None
+        # sendfile only writes to regular files on Linux (macOS: sockets only)
+        self.fast_stored_copy = fast_stored_copy and (
+            hasattr(os, 'copy_file_range') or sys.platform.startswith('linux'))
+        self.preallocate_min = preallocate_mb * 1024**2 if hasattr(os, 'posix_fallocate') else 0
+        self.created_dirs = set()  # Output folders known to exist
+        self.mmap_reads = mmap_reads
+        self.maps = {}  # ZIP path -> MappedZip (None if it cannot be mapped)
+        self.verbose = True
+        self.incremental = incremental
+        self.list_deletions = list_deletions
+        self.previous = None  # (name, size, crc) of earlier imports, loaded by run()
+        self.manifest = None
+        if use_manifest or incremental:
+            self.manifest = ExtractionManifest(
+                self.output_folder.with_name(self.output_folder.name + ".manifest.sqlite"),
+                self.output_folder)
+        self.checksums = None
+        if checksum_algorithm:
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+            self.checksums = ChecksumManifest(
+                self.output_folder / f"checksums-{stamp}.{checksum_algorithm}",
+                checksum_algorithm, self.output_folder)
+        self.content = None
+        if dedup:
+            self.content = ContentIndex(
+                dedup, self.checksums.algorithm if self.checksums else "blake2b")
+        self.hash_cache = HashCache() if hash_cache else None
+        self.sidecars = None
+        if sidecar_store:
+            self.sidecars = SidecarStore(self.output_folder / "takeout_sidecars.sqlite")
+        self.photo_dates = photo_dates
+        self.photo_times = {}  # media path in ZIP -> taken time, sidecar seen before the media
+        self.undated = {}      # media path in ZIP -> written file still waiting for its sidecar
+        self.stats = self.new_stats()
+        self._pending = {}  # target path -> write still running in a thread
+    
+    @staticmethod
+    def new_stats():
+        """Empty statistics dictionary"""
+        return {
             'zips_processed': 0,
             'files_extracted': 0,
             'files_skipped': 0,
             'files_renamed': 0,
+            'files_resumed': 0,
+            'files_unchanged': 0,
+            'files_routed': 0,
+            'files_filtered': 0,
+            'bytes_filtered': 0,
+            'files_linked': 0,
+            'bytes_linked': 0,
+            'sidecars_stored': 0,
+            'dates_applied': 0,
             'total_size': 0,
             'errors': []
         }
     
+    def __getstate__(self):
+        """Ship configuration, not run statistics, to worker processes"""
+        state = self.__dict__.copy()
+        state['stats'] = self.new_stats()
+        state['previous'] = None  # Workers look members up in the manifest one by one
+        state['maps'] = {}
+        state['photo_times'] = {}  # Leftovers are paired up in merge_worker
+        state['undated'] = {}
+        return state
+    
+    def merge_stats(self, stats):
+        """Add statistics returned by a worker into self.stats"""
+        for key, value in stats.items():
+            if isinstance(value, list):
+                self.stats[key].extend(value)
+            else:
+                self.stats[key] += value
+    
+    def merge_worker(self, result):
+        """Merge what _extract_part_worker returned, returns the worker's stats"""
+        stats, undated, photo_times = result
+        self.merge_stats(stats)
+        # A photo and its sidecar may have been in parts of different workers
+        for media, taken in photo_times.items():
+            if media in self.undated:
+                self.set_photo_date(self.undated.pop(media), taken)
+            else:
+                self.photo_times[media] = taken
+        for media, path in undated.items():
+            if media in self.photo_times:
+                self.set_photo_date(path, self.photo_times.pop(media))
+            else:
+                self.undated[media] = path
+        return stats
+    
     def find_zip_files(self):
         """Find all ZIP files in the folder"""
         zip_files = sorted(self.zip_folder.glob("*.zip"))
         return zip_files
     
-    def get_file_hash(self, filepath):
-        """Calculate MD5 hash of a file"""
-        hash_md5 = hashlib.md5()
-        with open(filepath, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    
-    def get_zip_member_hash(self, zf, member):
-        """Calculate MD5 hash of a ZIP member"""
-        hash_md5 = hashlib.md5()
-        with zf.open(member) as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+    def get_file_crc32(self, filepath):
+        """Calculate CRC32 of a file (the checksum ZIP stores for each member)"""
+        if self.hash_cache is not None:
+            return int(self.hash_cache.get(
+                filepath, "crc32", lambda path: hash_file(path, "crc32", HASH_BUFFER_SIZE)), 16)
+        return self.read_file_crc32(filepath)
+    
+    def read_file_crc32(self, filepath):
+        return int(hash_file(filepath, "crc32", HASH_BUFFER_SIZE), 16)
+    
+    def mapped_zip(self, zip_path):
+        """Shared MappedZip for a ZIP part, or None if mapping is off or fails"""
+        if not self.mmap_reads:
+            return None
+        if zip_path not in self.maps:
+            try:
+                mapped = MappedZip(zip_path)
+            except (OSError, ValueError):
+                mapped = None  # Empty file, 32-bit Python with a huge ZIP, ...
+            # Another thread may have mapped it meanwhile - keep the first one
+            if self.maps.setdefault(zip_path, mapped) is not mapped and mapped is not None:
+                mapped.close()
+        return self.maps[zip_path]
+    
+    def close_maps(self):
+        for mapped in self.maps.values():
+            if mapped is not None:
+                mapped.close()
+        self.maps = {}
+    
+    def member_chunks(self, zf, member):
+        """Uncompressed data of a member in chunks, CRC checked"""
+        mapped = self.mapped_zip(zf.filename)
+        if mapped is not None and mapped.supports(member):
+            yield from mapped.chunks(member)
+        else:
+            with zf.open(member) as f:
+                yield from iter(lambda: f.read(HASH_BUFFER_SIZE), b"")
+    
+    def unchanged(self, member):
+        """Whether an incremental run already imported this exact file"""
+        if not self.incremental:
+            return False
+        if self.previous is None:
+            # A worker process: only this part's members are asked about, so
+            # look them up rather than loading every earlier import
+            return self.manifest.was_imported(member.filename, member.file_size, member.CRC)
+        return (member.filename, member.file_size, member.CRC) in self.previous
+    
+    def wanted(self, member):
+        """Whether a member passes the selective extraction filters"""
+        return (not member.is_dir() and not self.unchanged(member)
+                and not (self.sidecars and is_sidecar(member.filename))
+                and (self.filter is None or self.filter.matches(member)))
+    
+    def drop_filtered(self, members):
+        """Remove members excluded by the filters, counting what is avoided"""
+        if self.filter is None and not self.incremental:
+            return members
+        kept = []
+        for member in members:
+            if self.unchanged(member):
+                self.stats['files_unchanged'] += 1
+            elif self.filter is None or self.filter.matches(member):
+                kept.append(member)
+            else:
+                self.stats['files_filtered'] += 1
+                self.stats['bytes_filtered'] += member.file_size
+        return kept
+    
+    def report_deletions(self, zip_files):
+        """List files of earlier imports that are missing from this export
+        
+        Nothing is deleted from the output folder. The list is written next
+        to it and the paths are forgotten, so they are reported only once.
+        """
+        current = set()
+        for zip_path in zip_files:
+            try:
+                with zipfile.ZipFile(zip_path, 'r') as zf:
+                    current.update(m.filename for m in zf.filelist if not m.is_dir())
+            except Exception as e:
+                print(f"⚠️  Cannot check deletions, {zip_path.name} is unreadable: {e}")
+                return []
+        
+        gone = sorted(self.manifest.imported_names() - current)
+        if not gone:
+            print("✓ No files were removed since the last import")
+            return gone
+        
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        report = self.output_folder.with_name(f"{self.output_folder.name}.deleted-{stamp}.txt")
+        with open(report, 'w', encoding='utf-8') as f:
+            f.writelines(name + "\n" for name in gone)
+        print(f"🗑️  {len(gone)} file(s) from the last import are no longer in this export")
+        for name in gone[:5]:
+            print(f"   - {name}")
+        if len(gone) > 5:
+            print(f"   ... and {len(gone) - 5} more")
+        print(f"   Full list: {report} (nothing was deleted)")
+        self.manifest.forget_imported(gone)
+        return gone
+    
+    def target_for(self, member):
+        """Where a member goes by default: (path, route or None)"""
+        route = match_route(self.routes, member.filename) if self.routes else None
+        if route is not None:
+            return route['dest'] / member.filename.rsplit('/', 1)[-1], route
+        return self.output_folder / member.filename, None
+    
+    def handle_routed_duplicate(self, target_path, zf, member, route):
+        """Apply a route's identical/different policy to an existing file"""
+        identical = (target_path.stat().st_size == member.file_size
+                     and self.get_file_crc32(target_path) == member.CRC)
+        policy = route['identical'] if identical else route['different']
+        if policy == "rename":
+            return self.get_renamed_path(target_path, zf, member)
+        elif policy == "overwrite":
+            return "overwrite", target_path
+        return "skipped", target_path
     
     def handle_duplicate(self, target_path, zf, member):
         """Handle duplicate file based on mode"""
@@ -71,11 +1543,10 @@ class TakeoutExtractor:
             return self.get_renamed_path(target_path, zf, member)
         
         elif self.duplicate_mode == "compare":
-            # Compare hashes
-            existing_hash = self.get_file_hash(target_path)
-            new_hash = self.get_zip_member_hash(zf, member)
-            
-            if existing_hash == new_hash:
+            # Compare with size and CRC32 from the ZIP directory, so the
+            # member is only decompressed if it really has to be extracted
+            if (target_path.stat().st_size == member.file_size
+                    and self.get_file_crc32(target_path) == member.CRC):
                 return "skipped", target_path
             else:
                 # Different content, rename
@@ -94,42 +1565,353 @@ class TakeoutExtractor:
         counter = 1
         
         new_path = parent / f"{stem}_copy{counter}{suffix}"
-        while new_path.exists():
+        while new_path in self._pending or new_path.exists():
             counter += 1
             new_path = parent / f"{stem}_copy{counter}{suffix}"
         
         return "renamed", new_path
     
+    def get_stored_data_offset(self, source, member):
+        """Position of a member's data in the ZIP, read from its local header"""
+        source.seek(member.header_offset)
+        return local_data_offset(member, source.read(30))
+    
+    def ensure_dir(self, directory):
+        """mkdir once per folder instead of once per file"""
+        if directory not in self.created_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self.created_dirs.add(directory)
+    
+    def make_directories(self, directories):
+        """Create every output folder of a plan up front, parents first"""
+        for directory in sorted(directories, key=lambda d: len(d.parts)):
+            self.ensure_dir(directory)
+        return len(directories)
+    
+    def preallocate(self, target, size):
+        """Reserve disk space for a large file about to be written"""
+        if self.preallocate_min and size >= self.preallocate_min:
+            try:
+                os.posix_fallocate(target.fileno(), 0, size)
+            except OSError:
+                self.preallocate_min = 0  # Not supported here - stop trying
+    
+    def copy_stored_member(self, zf, member, target_path, hasher=None):
+        """Copy a stored (uncompressed) member with kernel-side copies"""
+        with open(zf.filename, 'rb') as source, open(target_path, 'wb') as target:
+            self.preallocate(target, member.file_size)
+            offset = self.get_stored_data_offset(source, member)
+            remaining = member.file_size
+            use_copy_file_range = hasattr(os, 'copy_file_range')
+            
+            while remaining:
+                if use_copy_file_range:
+                    try:
+                        copied = os.copy_file_range(source.fileno(), target.fileno(),
+                                                    remaining, offset)
+                    except OSError as e:
+                        # Not supported here (old kernel, cross-device) - try sendfile
+                        if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                                           errno.EOPNOTSUPP) or not hasattr(os, 'sendfile'):
+                            raise
+                        use_copy_file_range = False
+                        continue
+                else:
+                    copied = os.sendfile(target.fileno(), source.fileno(), offset, remaining)
+                if copied == 0:
+                    raise zipfile.BadZipFile(f"Truncated data for {member.filename}")
+                offset += copied
+                remaining -= copied
+        
+        # The bytes never passed through Python, so verify them afterwards
+        # (the checksum, if wanted, is computed in the same read)
+        crc = 0
+        with open(target_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
+                crc = zlib.crc32(chunk, crc)
+                if hasher is not None:
+                    hasher.update(chunk)
+        if crc != member.CRC:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {member.filename!r}")
+    
+    def link_duplicate(self, zf, member, target_path):
+        """Link target_path to an identical file written earlier, returns True if done"""
+        if self.content is None or member.file_size == 0:
+            return False
+        earlier = self.content.lookup(member.file_size, member.CRC)
+        if earlier is None:
+            return False
+        
+        # Same size and CRC32 - confirm with the strong hash before linking
+        source_path, digest = earlier
+        hasher = self.content.new_hasher()
+        for chunk in self.member_chunks(zf, member):
+            hasher.update(chunk)
+        if hasher.hexdigest() != digest or not self.content.link(source_path, target_path):
+            return False
+        
+        if self.checksums:
+            self.checksums.add(target_path, digest)
+        self.stats['files_linked'] += 1
+        self.stats['bytes_linked'] += member.file_size
+        return True
+    
+    def release_target(self, target_path):
+        """Remove a file about to be replaced and forget it as a link source
+        
+        Never write through an existing file - it may be a hardlink.
+        """
+        self.content.forget(target_path)
+        try:
+            target_path.unlink()
+        except FileNotFoundError:
+            pass
+    
     def extract_file(self, zf, member, target_path):
         """Extract a single file from ZIP"""
         try:
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-            with zf.open(member) as source, open(target_path, 'wb') as target:
-                shutil.copyfileobj(source, target)
+            self.ensure_dir(target_path.parent)
+            if self.content:
+                self.release_target(target_path)
+                if self.link_duplicate(zf, member, target_path):
+                    return True
+            
+            hasher = None
+            if self.checksums or self.content:
+                hasher = (self.checksums or self.content).new_hasher()
+            try:
+                copied = False
+                if (self.fast_stored_copy and member.compress_type == zipfile.ZIP_STORED
+                        and not member.flag_bits & 0x1):
+                    try:
+                        self.copy_stored_member(zf, member, target_path, hasher)
+                        copied = True
+                    except OSError:
+                        # The kernel refused the copy - write it the normal way
+                        # (truncating the partial file) and stop trying
+                        self.fast_stored_copy = False
+                if not copied:
+                    with open(target_path, 'wb') as target:
+                        self.preallocate(target, member.file_size)
+                        for chunk in self.member_chunks(zf, member):
+                            if hasher is not None:
+                                hasher.update(chunk)  # Hash on the way to disk - no second read
+                            target.write(chunk)
+            except BaseException:
+                # Never leave a half-written file behind: a preallocated one
+                # already has its full size and would pass as done
+                try:
+                    target_path.unlink()
+                except OSError:
+                    pass
+                raise
+            if self.checksums:
+                self.checksums.add(target_path, hasher.hexdigest())
+            if self.content and member.file_size:
+                self.content.add(target_path, member.file_size, member.CRC, hasher.hexdigest())
             return True
         except Exception as e:
             self.stats['errors'].append(f"Error extracting {member.filename}: {e}")
             return False
     
-    def extract_with_merge(self, zip_path):
-        """Extract ZIP file and merge with existing content"""
-        print(f"\n📦 Processing: {zip_path.name}")
+    def resolve_target(self, zf, member):
+        """Decide what to do with a member, returns (action, final_path)
+        
+        action is "new", "skipped", "renamed" or "overwrite".
+        """
+        target_path, route = self.target_for(member)
+        
+        # A thread may still be writing this path - wait so the decision
+        # sees the same file a one-at-a-time run would
+        pending = self._pending.get(target_path)
+        if pending is not None:
+            pending.result()
+        
+        if target_path.exists():
+            if route is not None:
+                return self.handle_routed_duplicate(target_path, zf, member, route)
+            return self.handle_duplicate(target_path, zf, member)
+        return "new", target_path
+    
+    def drop_completed(self, part, members):
+        """Remove members finished by an earlier run (one manifest lookup per ZIP)"""
+        if not self.manifest:
+            return members, 0
+        done = self.manifest.completed_members(part)
+        if not done:
+            return members, 0
+        remaining = [m for m in members
+                     if done.get((m.filename, m.header_offset)) != (m.CRC, m.file_size)]
+        return remaining, len(members) - len(remaining)
+    
+    def build_plan(self, zip_files):
+        """Decide the output path of every member of every ZIP up front
+        
+        Returns ({ZIP name: PartPlan}, output folders to create).
+        """
+        index = MemberIndex.open(zip_files, self.zip_folder / MEMBER_INDEX_FILE)
+        planner = CollisionPlanner(self.output_folder, self.duplicate_mode,
+                                   self.get_file_crc32, self.target_for, index)
+        self.stats['errors'].extend(index.errors)
+        for number, zip_path in enumerate(zip_files):
+            done = self.manifest.completed_members(zip_path.name) if self.manifest else {}
+            for i in index.part_range(number):
+                member = index.member(i)
+                if (self.wanted(member) and done.get((member.filename, member.header_offset))
+                        != (member.CRC, member.file_size)):
+                    planner.add(i, member)
+        plan = {zip_path.name: planner.part_plan(number)
+                for number, zip_path in enumerate(zip_files)}
+        index.close()
+        return plan, planner.directories
+    
+    def planned_target(self, plan, member):
+        """(action, output path) that build_plan decided for a member"""
+        action, counter = plan.lookup(member.header_offset)
+        target_path = self.target_for(member)[0]
+        if action == "renamed":
+            target_path = CollisionPlanner.copy_path(target_path, counter)
+        return action, target_path
+    
+    def store_sidecars(self, zf, part, members):
+        """Put photo sidecars into the sidecar store, returns the other members"""
+        rest = []
+        for member in members:
+            if not is_sidecar(member.filename):
+                rest.append(member)
+                continue
+            try:
+                self.sidecars.add(member.filename, zf.read(member))
+            except Exception as e:
+                self.stats['errors'].append(f"Error storing {member.filename}: {e}")
+                continue
+            self.stats['sidecars_stored'] += 1
+            if self.manifest:
+                self.manifest.record(part, member, self.sidecars.db_path, "stored")
+        self.sidecars.flush()
+        return rest
+    
+    def read_photo_times(self, zf, members):
+        """Taken times for the members about to be written, from their sidecars
+        
+        Sidecars are paired with media through the ZIP directory. A sidecar
+        whose photo is in another part is kept (or applied, if that photo
+        was already written) so nothing needs a second pass.
+        """
+        writing = {m.filename for m in members}
+        in_part = {m.filename for m in zf.filelist}
+        sidecars = {}  # sidecar name -> media path
+        for m in zf.filelist:
+            if is_sidecar(m.filename):
+                folder, _, name = m.filename.rpartition('/')
+                media = f"{folder}/{media_name_for(name)}"
+                if media in writing or media not in in_part:
+                    sidecars[m.filename] = media
         
+        names = list(sidecars)
+        if self.workers == 1 and len(names) >= 1000:
+            chunks = [names[i:i + 500] for i in range(0, len(names), 500)]
+            parsed = {}
+            with ProcessPoolExecutor() as pool:
+                for result in pool.map(_read_photo_times_worker,
+                                       [zf.filename] * len(chunks), chunks):
+                    parsed.update(result)
+        else:
+            parsed = _read_photo_times_worker(zf.filename, names)
+        
+        times = {}
+        for name, taken in parsed.items():
+            media = sidecars[name]
+            if media in writing:
+                times[media] = taken
+            elif media in self.undated:
+                self.set_photo_date(self.undated.pop(media), taken)
+            else:
+                self.photo_times[media] = taken
+        return times
+    
+    def set_photo_date(self, path, taken):
         try:
-            with zipfile.ZipFile(zip_path, 'r') as zf:
-                members = [m for m in zf.filelist if not m.is_dir()]
-                total = len(members)
-                extracted = 0
-                skipped = 0
-                renamed = 0
-                
-                print(f"   Files: {total}")
-                print(f"   Mode: {self.duplicate_mode}")
-                
-                # Progress bar
-                bar_length = 50
-                
-                for i, member in enumerate(members):
+            os.utime(path, (taken, taken))
+            self.stats['dates_applied'] += 1
+        except OSError as e:
+            self.stats['errors'].append(f"Cannot set date of {path}: {e}")
+    
+    def apply_photo_date(self, member, final_path, times):
+        """Give a just-written file the date its photo was taken"""
+        taken = times.get(member.filename)
+        if taken is None:
+            taken = self.photo_times.pop(member.filename, None)
+        if taken is not None:
+            self.set_photo_date(final_path, taken)
+        elif not member.filename.lower().endswith('.json') and is_sidecar(member.filename + ".json"):
+            self.undated[member.filename] = final_path  # Sidecar may be in a later part
+    
+    def extract_members(self, zf, members, plan=None, times=None):
+        """Extract members of an open ZIP, returns (extracted, skipped, renamed)
+        
+        With a plan from build_plan the output folder is never probed.
+        times are taken times already read by read_photo_times, if any.
+        """
+        part = Path(zf.filename).name
+        counts = {'extracted': 0, 'skipped': 0, 'renamed': 0}
+        
+        members, resumed = self.drop_completed(part, members)
+        self.stats['files_resumed'] += resumed
+        if self.sidecars:
+            members = self.store_sidecars(zf, part, members)
+        total = len(members)
+        if times is None and self.photo_dates:
+            times = self.read_photo_times(zf, members)
+        
+        decisions = None
+        if plan is not None:
+            # Decisions are fixed, so write folder by folder (ZIP order within each)
+            decided = sorted(((m, *self.planned_target(plan, m)) for m in members),
+                             key=lambda d: (str(d[2].parent), d[0].header_offset))
+            members = [m for m, _, _ in decided]
+            decisions = iter([(action, path) for _, action, path in decided])
+        
+        def record(action, ok, member, final_path):
+            if ok:
+                counts['extracted'] += 1
+                if action == "renamed":
+                    counts['renamed'] += 1
+                self.stats['total_size'] += member.file_size
+                if self.routes and match_route(self.routes, member.filename):
+                    self.stats['files_routed'] += 1
+                if self.manifest:
+                    self.manifest.record(part, member, final_path, action)
+                if times is not None:
+                    self.apply_photo_date(member, final_path, times)
+        
+        pool = None
+        if self.threads > 1 and total > 1:
+            pool = ThreadPoolExecutor(max_workers=self.threads)
+            budget = ByteBudget(self.max_inflight)
+            local = threading.local()
+            handles = []
+            handles_lock = threading.Lock()
+            
+            def write(member, final_path, reserved):
+                try:
+                    # Every thread inflates through its own ZIP handle
+                    thread_zf = getattr(local, 'zf', None)
+                    if thread_zf is None:
+                        thread_zf = local.zf = zipfile.ZipFile(zf.filename, 'r')
+                        with handles_lock:
+                            handles.append(thread_zf)
+                    return self.extract_file(thread_zf, member, final_path)
+                finally:
+                    budget.release(reserved)
+        
+        # Progress bar
+        bar_length = 50
+        running = []
+        
+        try:
+            for i, member in enumerate(members):
+                if self.verbose:
                     # Calculate progress
                     progress = (i + 1) / total
                     filled = int(bar_length * progress)
@@ -138,50 +1920,529 @@ class TakeoutExtractor:
                     
                     # Show progress bar
                     print(f"\r   [{bar}] {percent:.1f}% ({i+1}/{total})", end='', flush=True)
-                    
-                    # Get target path
-                    target_path = self.output_folder / member.filename
-                    
-                    # Handle file
-                    if target_path.exists():
-                        action, final_path = self.handle_duplicate(target_path, zf, member)
-                        
-                        if action == "skipped":
-                            skipped += 1
-                        elif action == "renamed":
-                            if self.extract_file(zf, member, final_path):
-                                renamed += 1
-                                extracted += 1
-                                self.stats['total_size'] += member.file_size
-                        elif action == "overwrite":
-                            if self.extract_file(zf, member, final_path):
-                                extracted += 1
-                                self.stats['total_size'] += member.file_size
-                    else:
-                        # New file, extract
-                        if self.extract_file(zf, member, target_path):
-                            extracted += 1
-                            self.stats['total_size'] += member.file_size
                 
-                print()  # New line after progress bar
-                print(f"   ✅ Extracted: {extracted} files")
-                if skipped > 0:
-                    print(f"   ⏭️  Skipped: {skipped} duplicates")
-                if renamed > 0:
-                    print(f"   📝 Renamed: {renamed} files")
+                # Decisions are always made here, in ZIP order
+                if decisions is not None:
+                    action, final_path = next(decisions)
+                else:
+                    action, final_path = self.resolve_target(zf, member)
+                
+                if action == "superseded":
+                    # Replaced by a later ZIP in this run
+                    counts['skipped'] += 1
+                    if self.manifest:
+                        self.manifest.mark_imported(member)
+                elif action == "skipped":
+                    counts['skipped'] += 1
+                    if self.manifest:
+                        self.manifest.record(part, member, final_path, action)
+                elif pool is None:
+                    record(action, self.extract_file(zf, member, final_path), member, final_path)
+                else:
+                    reserved = budget.acquire(member.file_size)
+                    future = pool.submit(write, member, final_path, reserved)
+                    self._pending[final_path] = future
+                    running.append((future, action, member, final_path))
+            
+            for future, action, member, final_path in running:
+                record(action, future.result(), member, final_path)
+        finally:
+            if self.manifest:
+                self.manifest.flush()
+            if pool is not None:
+                pool.shutdown(wait=True)
+                for handle in handles:
+                    handle.close()
+            self._pending = {}
+            self.close_maps()
+        
+        if self.verbose and total:
+            print()  # New line after progress bar
+        
+        self.stats['files_extracted'] += counts['extracted']
+        self.stats['files_skipped'] += counts['skipped']
+        self.stats['files_renamed'] += counts['renamed']
+        
+        return counts['extracted'], counts['skipped'], counts['renamed']
+    
+    def extract_with_merge(self, zip_path, skip_names=None, plan=None):
+        """Extract ZIP file and merge with existing content
+        
+        Members listed in skip_names are left for a later pass.
+        plan is this ZIP's part of build_plan, if collisions were planned.
+        """
+        if self.verbose:
+            print(f"\n📦 Processing: {zip_path.name}")
+        
+        try:
+            with zipfile.ZipFile(zip_path, 'r') as zf:
+                members = [m for m in zf.filelist
+                           if not m.is_dir() and not (skip_names and m.filename in skip_names)]
+                members = self.drop_filtered(members)
+                
+                if self.verbose:
+                    print(f"   Files: {len(members)}")
+                    print(f"   Mode: {self.duplicate_mode}")
+                
+                extracted, skipped, renamed = self.extract_members(zf, members, plan)
+                
+                if self.verbose:
+                    print(f"   ✅ Extracted: {extracted} files")
+                    if skipped > 0:
+                        print(f"   ⏭️  Skipped: {skipped} duplicates")
+                    if renamed > 0:
+                        print(f"   📝 Renamed: {renamed} files")
                 
                 self.stats['zips_processed'] += 1
-                self.stats['files_extracted'] += extracted
-                self.stats['files_skipped'] += skipped
-                self.stats['files_renamed'] += renamed
                 
                 return True
                 
         except Exception as e:
-            print(f"   ❌ Error: {e}")
+            if self.verbose:
+                print(f"   ❌ Error: {e}")
             self.stats['errors'].append(f"Error processing {zip_path.name}: {e}")
             return False
     
+    def find_shared_members(self, zip_files):
+        """Map each ZIP to member names whose output path another ZIP also uses
+        
+        Only central directories are read. Parallel workers leave these
+        members alone so collisions are resolved later in ZIP order.
+        """
+        owners = {}
+        for zip_path in zip_files:
+            try:
+                with zipfile.ZipFile(zip_path, 'r') as zf:
+                    for member in zf.filelist:
+                        if self.wanted(member):
+                            target = os.path.normcase(str(self.target_for(member)[0]))
+                            owners.setdefault(target, []).append((zip_path, member.filename))
+            except Exception as e:
+                self.stats['errors'].append(f"Error reading {zip_path.name}: {e}")
+        
+        shared = {zip_path: set() for zip_path in zip_files}
+        for owned in owners.values():
+            if len(owned) > 1:
+                for zip_path, name in owned:
+                    shared[zip_path].add(name)
+        return shared
+    
+    def extract_parallel(self, zip_files, plan=None):
+        """Extract whole ZIP parts in a pool of worker processes"""
+        self.open_manifest()
+        if plan is not None:
+            # Every output path is already unique - nothing has to wait
+            shared = {zip_path: set() for zip_path in zip_files}
+        else:
+            shared = self.find_shared_members(zip_files)
+        contested = sum(len(names) for names in shared.values())
+        
+        # Largest parts first, so a huge part never starts last and stalls the pool
+        by_size = sorted(zip_files, key=lambda p: p.stat().st_size, reverse=True)
+        
+        print(f"⚡ {len(zip_files)} ZIP(s) on {self.workers} worker processes (largest first)")
+        if contested:
+            print(f"   {contested} member(s) shared between ZIPs will be merged afterwards")
+        
+        done = 0
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(_extract_part_worker, self, zip_path, shared[zip_path],
+                            plan.get(zip_path.name) if plan else None): zip_path
+                for zip_path in by_size
+            }
+            for future in as_completed(futures):
+                zip_path = futures[future]
+                done += 1
+                try:
+                    stats = self.merge_worker(future.result())
+                except Exception as e:
+                    self.stats['errors'].append(f"Error processing {zip_path.name}: {e}")
+                    print(f"[{done}/{len(zip_files)}] ❌ {zip_path.name}: {e}")
+                    continue
+                print(f"[{done}/{len(zip_files)}] ✅ {zip_path.name}: "
+                      f"{stats['files_extracted']} extracted, {stats['files_skipped']} skipped")
+        
+        # Shared members go through the serial path in ZIP order
+        if contested:
+            print(f"\n🔀 Merging {contested} shared member(s)...")
+            for zip_path in zip_files:
+                names = shared[zip_path]
+                if not names:
+                    continue
+                try:
+                    with zipfile.ZipFile(zip_path, 'r') as zf:
+                        members = [m for m in zf.filelist if m.filename in names]
+                        self.extract_members(zf, members)
+                except Exception as e:
+                    self.stats['errors'].append(f"Error processing {zip_path.name}: {e}")
+    
+    def write_chunks(self, chunks, target_path):
+        """Write data chunks to a file, adding it to the checksum file if enabled"""
+        self.ensure_dir(target_path.parent)
+        if self.content:
+            self.release_target(target_path)
+        hasher = self.checksums.new_hasher() if self.checksums else None
+        try:
+            with open(target_path, 'wb') as target:
+                for chunk in chunks:
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    target.write(chunk)
+        except BaseException:
+            # Never leave a half-written file behind
+            try:
+                target_path.unlink()
+            except OSError:
+                pass
+            raise
+        return hasher
+    
+    def extract_streaming(self, partial_path, final_path, poll_interval=1.0):
+        """Extract a ZIP while it is still being downloaded
+        
+        Members are written as soon as their data has arrived. When the
+        download is complete, every streamed member is checked against the
+        central directory, and anything that could not be streamed is
+        extracted the normal way.
+        """
+        final_path = Path(final_path)
+        part = final_path.name
+        reader = StreamingZipReader(partial_path, final_path, poll_interval)
+        done = self.manifest.completed_members(part) if self.manifest else {}
+        streamed = {}  # header offset -> (name, final output path, action, CRC, size as streamed)
+        counts = {'extracted': 0, 'skipped': 0, 'renamed': 0}
+        
+        if self.verbose:
+            print(f"\n📡 Streaming: {part} (still downloading)")
+        
+        temp_path = None  # Temporary file of the member being streamed, if any
+        try:
+            for member in reader.members():
+                info = member.info
+                if info.is_dir():
+                    continue
+                # Filtered members are counted with the rest of the ZIP below
+                if self.filter and not self.filter.matches_name(info.filename):
+                    continue
+                if self.sidecars and is_sidecar(info.filename):
+                    continue  # Stored with the rest of the ZIP below
+                if self.filter and not member.has_descriptor and not self.filter.matches_size(info.file_size):
+                    continue
+                
+                if not member.has_descriptor:
+                    if done.get((info.filename, info.header_offset)) == (info.CRC, info.file_size):
+                        self.stats['files_resumed'] += 1
+                        streamed[info.header_offset] = (info.filename, None, "resumed", info.CRC, info.file_size)
+                        continue
+                    if self.unchanged(info):
+                        self.stats['files_unchanged'] += 1
+                        streamed[info.header_offset] = (info.filename, None, "unchanged", info.CRC, info.file_size)
+                        continue
+                    action, out_path = self.resolve_target(None, info)
+                    if action != "skipped":
+                        hasher = self.write_chunks(member.chunks(), out_path)
+                else:
+                    # Size and CRC come after the data - write to a temporary
+                    # file first, then decide like any other member. It is
+                    # staged in the target's folder (a route may point to
+                    # another drive), so moving it into place is a rename
+                    target_path = self.target_for(info)[0]
+                    temp_path = target_path.with_name(f".{target_path.name}.streaming")
+                    hasher = self.write_chunks(member.chunks(), temp_path)
+                    if self.filter and not self.filter.matches_size(info.file_size):
+                        temp_path.unlink()
+                        temp_path = None
+                        continue
+                    if self.unchanged(info):
+                        temp_path.unlink()
+                        temp_path = None
+                        self.stats['files_unchanged'] += 1
+                        streamed[info.header_offset] = (info.filename, None, "unchanged", info.CRC, info.file_size)
+                        continue
+                    action, out_path = self.resolve_target(None, info)
+                    if action == "skipped":
+                        temp_path.unlink()
+                    else:
+                        if self.content:
+                            self.content.forget(out_path)  # The rename replaces it
+                        os.replace(temp_path, out_path)
+                    temp_path = None
+                
+                if action == "skipped":
+                    counts['skipped'] += 1
+                else:
+                    if hasher is not None:
+                        self.checksums.add(out_path, hasher.hexdigest())
+                    counts['extracted'] += 1
+                    if action == "renamed":
+                        counts['renamed'] += 1
+                    self.stats['total_size'] += info.file_size
+                    if self.routes and match_route(self.routes, info.filename):
+                        self.stats['files_routed'] += 1
+                if self.manifest:
+                    self.manifest.record(part, info, out_path, action)
+                # chunks() checked the data against these values on the way
+                streamed[info.header_offset] = (info.filename, out_path, action, info.CRC, info.file_size)
+                
+                if self.verbose:
+                    print(f"\r   Extracted so far: {counts['extracted']}"
+                          f" | Skipped: {counts['skipped']}", end='', flush=True)
+        except (zipfile.BadZipFile, EOFError, OSError) as e:
+            # Whatever is left is extracted from the complete ZIP below
+            self.stats['errors'].append(f"Streaming {part} stopped: {e}")
+            if temp_path is not None:
+                try:
+                    temp_path.unlink()
+                except OSError:
+                    pass
+        
+        if self.verbose:
+            print()
+            if reader.stopped_at is not None:
+                print(f"   ⏸️  Rest of the ZIP is extracted when the download is complete")
+            print("   ⏳ Waiting for the download to finish...")
+        reader.wait_until_complete()
+        if self.manifest:
+            self.manifest.flush()
+        
+        self.stats['files_extracted'] += counts['extracted']
+        self.stats['files_skipped'] += counts['skipped']
+        self.stats['files_renamed'] += counts['renamed']
+        
+        try:
+            with zipfile.ZipFile(final_path, 'r') as zf:
+                by_offset = {m.header_offset: m for m in zf.filelist}
+                
+                # Streamed data must match the central directory (no re-read:
+                # the streamed CRC and size were verified while writing)
+                written = []  # (member, output path) of files streamed in this run
+                for offset, (name, out_path, action, crc, size) in streamed.items():
+                    member = by_offset.get(offset)
+                    if member is None or member.filename != name:
+                        self.stats['errors'].append(f"{name}: not in the central directory of {part}")
+                        continue
+                    if out_path is None or action == "skipped":
+                        continue
+                    if member.CRC != crc or member.file_size != size:
+                        self.stats['errors'].append(f"{name}: streamed copy did not match, re-extracted")
+                        self.extract_file(zf, member, out_path)
+                    written.append((member, out_path))
+                
+                rest = [m for m in zf.filelist
+                        if not m.is_dir() and m.header_offset not in streamed]
+                rest = self.drop_filtered(rest)
+                
+                times = None
+                if self.photo_dates:
+                    # Sidecars are paired once, over the whole directory, so
+                    # streamed photos get their dates and no sidecar is lost
+                    times = self.read_photo_times(zf, [m for m, _ in written] + rest)
+                    for member, out_path in written:
+                        self.apply_photo_date(member, out_path, times)
+                if rest:
+                    if self.verbose:
+                        print(f"   Extracting {len(rest)} remaining file(s)")
+                    self.extract_members(zf, rest, times=times)
+            self.stats['zips_processed'] += 1
+            return True
+        except Exception as e:
+            self.stats['errors'].append(f"Error processing {part}: {e}")
+            return False
+    
+    def extract_as_available(self, zip_paths):
+        """Extract ZIP parts in the order they arrive from an iterable
+        
+        The iterable may block between parts (e.g. while downloads are
+        still running), so extraction overlaps with whatever produces them.
+        With one worker, a path ending in .crdownload is a part that is still
+        downloading; it is extracted with extract_streaming.
+        With several workers, a member whose name already came with an
+        earlier part is merged after all parts are done, in arrival order.
+        """
+        arrived = []
+        try:
+            self.open_manifest()
+            if self.workers == 1:
+                for zip_path in zip_paths:
+                    print(f"\n[{len(arrived) + 1}]", end=' ')
+                    if zip_path.suffix == '.crdownload':
+                        zip_path, partial_path = zip_path.with_suffix(''), zip_path
+                        self.extract_streaming(partial_path, zip_path)
+                    else:
+                        self.extract_with_merge(zip_path)
+                    arrived.append(zip_path)
+                return arrived
+            
+            seen_targets = set()
+            deferred = []
+            futures = {}
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                for zip_path in zip_paths:
+                    arrived.append(zip_path)
+                    try:
+                        with zipfile.ZipFile(zip_path, 'r') as zf:
+                            targets = {}
+                            for m in zf.filelist:
+                                if self.wanted(m):
+                                    target = os.path.normcase(str(self.target_for(m)[0]))
+                                    targets.setdefault(target, set()).add(m.filename)
+                    except Exception as e:
+                        self.stats['errors'].append(f"Error reading {zip_path.name}: {e}")
+                        print(f"❌ {zip_path.name}: {e}")
+                        continue
+                    later = set()
+                    for target in targets.keys() & seen_targets:
+                        later |= targets[target]
+                    seen_targets |= targets.keys()
+                    if later:
+                        deferred.append((zip_path, later))
+                    
+                    future = pool.submit(_extract_part_worker, self, zip_path, later)
+                    futures[future] = zip_path
+                    future.add_done_callback(
+                        lambda f, name=zip_path.name: print(
+                            f"   {'✅' if f.exception() is None else '❌'} Extracted: {name}", flush=True))
+                    print(f"📥 Queued for extraction: {zip_path.name}", flush=True)
+            
+            for future, zip_path in futures.items():
+                try:
+                    self.merge_worker(future.result())
+                except Exception as e:
+                    self.stats['errors'].append(f"Error processing {zip_path.name}: {e}")
+            
+            if deferred:
+                print(f"\n🔀 Merging {sum(len(n) for _, n in deferred)} shared member(s)...")
+                for zip_path, names in deferred:
+                    try:
+                        with zipfile.ZipFile(zip_path, 'r') as zf:
+                            members = [m for m in zf.filelist if m.filename in names]
+                            self.extract_members(zf, members)
+                    except Exception as e:
+                        self.stats['errors'].append(f"Error processing {zip_path.name}: {e}")
+            return arrived
+        finally:
+            self.close()
+    
+    def close(self):
+        """Write out the manifest, checksum file, sidecar store and hash cache"""
+        self.close_maps()
+        if self.manifest:
+            self.manifest.close()
+        if self.checksums:
+            self.checksums.close()
+        if self.sidecars:
+            self.sidecars.close()
+        if self.hash_cache:
+            self.hash_cache.close()
+    
+    def print_summary(self, zip_count, elapsed):
+        """Final statistics"""
+        print("\n" + "="*70)
+        print("📊 EXTRACTION COMPLETE!")
+        print("="*70)
+        print(f"✅ ZIPs processed: {self.stats['zips_processed']}/{zip_count}")
+        print(f"📄 Files extracted: {self.stats['files_extracted']}")
+        print(f"⏭️  Files skipped: {self.stats['files_skipped']} (duplicates)")
+        if self.stats['files_resumed'] > 0:
+            print(f"♻️  Already done in a previous run: {self.stats['files_resumed']}")
+        if self.stats['files_unchanged'] > 0:
+            print(f"📅 Unchanged since the last import: {self.stats['files_unchanged']}")
+        if self.stats['files_renamed'] > 0:
+            print(f"📝 Files renamed: {self.stats['files_renamed']}")
+        if self.stats['files_routed'] > 0:
+            print(f"🔀 Files routed to other folders: {self.stats['files_routed']}")
+        if self.stats['files_filtered'] > 0:
+            print(f"🚫 Filtered out: {self.stats['files_filtered']} files "
+                  f"({self.stats['bytes_filtered'] / (1024**3):.2f} GB not extracted)")
+        if self.stats['sidecars_stored'] > 0:
+            print(f"🗃️  Photo sidecars stored: {self.stats['sidecars_stored']} "
+                  f"(in {self.sidecars.db_path.name})")
+        if self.stats['dates_applied'] > 0:
+            print(f"📅 Photo dates applied: {self.stats['dates_applied']}")
+        if self.stats['files_linked'] > 0:
+            print(f"🔗 Identical files linked: {self.stats['files_linked']} "
+                  f"({self.stats['bytes_linked'] / (1024**3):.2f} GB not written)")
+        print(f"💾 Total extracted: {self.stats['total_size'] / (1024**3):.2f} GB")
+        print(f"⏱️  Time taken: {elapsed/60:.1f} minutes")
+        
+        if self.stats['errors']:
+            print(f"\n⚠️  Errors: {len(self.stats['errors'])}")
+            for error in self.stats['errors'][:5]:
+                print(f"   - {error}")
+            if len(self.stats['errors']) > 5:
+                print(f"   ... and {len(self.stats['errors']) - 5} more")
+        
+        print(f"\n📂 All files extracted to: {self.output_folder}")
+        print("="*70 + "\n")
+    
+    def verify(self, zip_files=None, full=False, workers=VERIFY_WORKERS,
+               chunk_mb=VERIFY_CHUNK_MB):
+        """Check all ZIP parts in parallel before extraction
+        
+        Returns {zip path: [problems]} for the bad parts.
+        """
+        zip_files = self.find_zip_files() if zip_files is None else zip_files
+        workers = workers or os.cpu_count() or 1
+        problems = {zip_path: [] for zip_path in zip_files}
+        
+        print(f"\n🔍 Checking {len(zip_files)} ZIP file(s) with {workers} process(es)...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_check_structure_worker, str(zip_path), chunk_mb * 1024**2): zip_path
+                       for zip_path in zip_files}
+            jobs = []
+            for future in as_completed(futures):
+                zip_path = futures[future]
+                found, chunks = future.result()
+                problems[zip_path].extend(found)
+                if found:
+                    print(f"❌ {zip_path.name}: {found[0]}")
+                elif full:
+                    jobs.extend((zip_path, first, last) for first, last in chunks)
+            
+            if full and jobs:
+                print(f"🔍 Decompressing and checking CRC32 of every file ({len(jobs)} chunks)...")
+                futures = {pool.submit(_check_members_worker, str(zip_path), first, last): zip_path
+                           for zip_path, first, last in jobs}
+                for future in as_completed(futures):
+                    zip_path = futures[future]
+                    try:
+                        found = future.result()
+                    except Exception as e:
+                        found = [str(e)]
+                    if found and not problems[zip_path]:
+                        print(f"❌ {zip_path.name}: {found[0]}")
+                    problems[zip_path].extend(found)
+        
+        bad = {zip_path: found for zip_path, found in problems.items() if found}
+        print("\n" + "="*70)
+        if not bad:
+            check = "full CRC32 check" if full else "structure check"
+            print(f"✅ All {len(zip_files)} ZIP file(s) passed the {check}")
+        else:
+            print(f"❌ {len(bad)} of {len(zip_files)} ZIP file(s) are damaged:")
+            indices = []
+            for zip_path in sorted(bad):
+                index = takeout_index(zip_path)
+                label = f"index {index}" if index is not None else "unknown index"
+                print(f"   - {zip_path.name} ({label}): {len(bad[zip_path])} problem(s)")
+                if index is not None:
+                    indices.append(index)
+            if indices:
+                print(f"\n💡 Delete these files and download these indexes again: "
+                      f"{', '.join(str(i) for i in sorted(indices))}")
+                print(f"   e.g. python scripts/download_takeout.py {indices[0]} {indices[0]}")
+        print("="*70 + "\n")
+        return bad
+    
+    def open_manifest(self):
+        """Check the manifest against the output folder, before any worker uses it"""
+        if not self.manifest or self.manifest.conn is not None:
+            return
+        self.manifest.connect()
+        if self.manifest.cleared:
+            print(f"♻️  {self.output_folder} is new or was emptied - earlier manifest records cleared")
+    
     def run(self):
         """Main extraction process"""
         print("="*70)
@@ -190,12 +2451,32 @@ class TakeoutExtractor:
         print(f"\n📁 ZIP folder: {self.zip_folder}")
         print(f"📂 Output folder: {self.output_folder}")
         print(f"🔧 Duplicate mode: {self.duplicate_mode}")
+        if self.workers > 1:
+            print(f"⚡ Worker processes: {self.workers}")
+        if self.threads > 1:
+            print(f"🧵 Threads per ZIP: {self.threads}")
+        if self.manifest:
+            print(f"🗂️  Manifest: {self.manifest.db_path}")
+        if self.checksums:
+            print(f"🔐 Checksums ({self.checksums.algorithm}): {self.checksums.path}")
+        if self.content:
+            print(f"🔗 Identical files become links ({self.content.link_mode})")
+        if self.sidecars:
+            print(f"🗃️  Photo sidecars: {self.sidecars.db_path}")
+        if self.photo_dates:
+            print("📅 Photo dates: taken from the .json sidecars")
+        if self.filter:
+            active = {k: v for k, v in vars(self.filter).items() if v}
+            print(f"🚫 Filters: {active}")
+        for route in self.routes:
+            print(f"🔀 Route: {', '.join(route['patterns'])} → {route['dest']}"
+                  f" (identical: {route['identical']}, different: {route['different']})")
         
         # Explain duplicate modes
         print("\n💡 Duplicate handling modes:")
         print("   • skip: Skip files with same size (fastest)")
         print("   • rename: Keep all versions with _copy suffix")
-        print("   • compare: Compare file hashes, skip identical (slower)")
+        print("   • compare: Compare checksums (CRC32), skip identical (slower)")
         print("   • overwrite: Replace existing files (not recommended)")
         print(f"\n   Current mode: {self.duplicate_mode}")
         
@@ -236,45 +2517,80 @@ class TakeoutExtractor:
         
         start_time = datetime.now()
         
-        for i, zip_file in enumerate(zip_files, 1):
-            print(f"\n[{i}/{len(zip_files)}]", end=' ')
-            self.extract_with_merge(zip_file)
+        try:
+            self.open_manifest()
+            if self.incremental:
+                self.previous = self.manifest.imported_members()
+                print(f"📅 Incremental import: {len(self.previous):,} file(s) known from earlier imports")
+                if self.list_deletions and self.previous:
+                    self.report_deletions(zip_files)
+                print()
+            
+            plan = None
+            if self.plan_collisions:
+                print("🧭 Planning output paths from ZIP directories...")
+                plan, directories = self.build_plan(zip_files)
+                actions = {}
+                for part_plan in plan.values():
+                    for action, count in part_plan.counts().items():
+                        actions[action] = actions.get(action, 0) + count
+                print(f"   New: {actions.get('new', 0)} | Renamed: {actions.get('renamed', 0)}"
+                      f" | Skipped: {actions.get('skipped', 0)}"
+                      f" | Overwritten: {actions.get('overwrite', 0)}")
+                print(f"📁 Created {self.make_directories(directories)} output folders\n")
+            
+            if self.workers > 1 and len(zip_files) > 1:
+                self.extract_parallel(zip_files, plan)
+            else:
+                for i, zip_file in enumerate(zip_files, 1):
+                    print(f"\n[{i}/{len(zip_files)}]", end=' ')
+                    self.extract_with_merge(zip_file, plan=plan.get(zip_file.name) if plan else None)
+        finally:
+            self.close()
         
         # Final summary
         elapsed = (datetime.now() - start_time).total_seconds()
-        
-        print("\n" + "="*70)
-        print("📊 EXTRACTION COMPLETE!")
-        print("="*70)
-        print(f"✅ ZIPs processed: {self.stats['zips_processed']}/{len(zip_files)}")
-        print(f"📄 Files extracted: {self.stats['files_extracted']}")
-        print(f"⏭️  Files skipped: {self.stats['files_skipped']} (duplicates)")
-        if self.stats['files_renamed'] > 0:
-            print(f"📝 Files renamed: {self.stats['files_renamed']}")
-        print(f"💾 Total extracted: {self.stats['total_size'] / (1024**3):.2f} GB")
-        print(f"⏱️  Time taken: {elapsed/60:.1f} minutes")
-        
-        if self.stats['errors']:
-            print(f"\n⚠️  Errors: {len(self.stats['errors'])}")
-            for error in self.stats['errors'][:5]:
-                print(f"   - {error}")
-            if len(self.stats['errors']) > 5:
-                print(f"   ... and {len(self.stats['errors']) - 5} more")
-        
-        print(f"\n📂 All files extracted to: {self.output_folder}")
-        print("="*70 + "\n")
+        self.print_summary(len(zip_files), elapsed)
+
+def create_extractor(zip_folder=ZIP_FOLDER):
+    """TakeoutExtractor with the settings at the top of this file"""
+    return TakeoutExtractor(zip_folder, OUTPUT_FOLDER, DUPLICATE_MODE,
+                            workers=PARALLEL_WORKERS,
+                            threads=MEMBER_THREADS,
+                            max_inflight_mb=MAX_INFLIGHT_MB,
+                            use_manifest=USE_MANIFEST,
+                            plan_collisions=PLAN_COLLISIONS,
+                            fast_stored_copy=FAST_STORED_COPY,
+                            checksum_algorithm=CHECKSUM_ALGORITHM,
+                            routes=ROUTES,
+                            filters=FILTERS,
+                            dedup=DEDUP_CONTENT,
+                            incremental=INCREMENTAL_IMPORT,
+                            list_deletions=REPORT_DELETIONS,
+                            preallocate_mb=PREALLOCATE_MIN_MB,
+                            sidecar_store=SIDECAR_STORE,
+                            photo_dates=APPLY_PHOTO_DATES,
+                            mmap_reads=MMAP_READS,
+                            hash_cache=USE_HASH_CACHE)
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "verify":
+        full = "--full" in sys.argv[2:]
+        bad = TakeoutExtractor(ZIP_FOLDER, OUTPUT_FOLDER).verify(full=full)
+        sys.exit(1 if bad else 0)
+    
     print("="*70)
     print("Configuration")
     print("="*70)
     print(f"ZIP folder: {ZIP_FOLDER}")
     print(f"Output folder: {OUTPUT_FOLDER}")
     print(f"Duplicate mode: {DUPLICATE_MODE}")
+    print(f"Parallel workers: {PARALLEL_WORKERS}")
+    print(f"Threads per ZIP: {MEMBER_THREADS}")
     print("="*70 + "\n")
     
     # Create extractor
-    extractor = TakeoutExtractor(ZIP_FOLDER, OUTPUT_FOLDER, DUPLICATE_MODE)
+    extractor = create_extractor()
     
     # Run extraction
     extractor.run()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Hash Cache - Remember file hashes between runs
+One SQLite cache shared by extract_takeout.py and organize_videos.py
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+# Configuration
+HASH_CACHE_DB = Path.home() / ".takeout_hash_cache.sqlite"  # One cache for all folders and tools
+HASH_CACHE_MAX_ENTRIES = 500000  # Least recently used hashes are dropped beyond this (~150 bytes each)
+
+def _int64(value):
+    """SQLite integers are signed 64-bit; Windows file IDs can use all 64 bits"""
+    return value - 2**64 if value >= 2**63 else value
+
+def file_key(st):
+    """(device, inode, size, mtime_ns) of an os.stat result, or None if the
+    filesystem has no stable file IDs (e.g. FAT on some systems)"""
+    if not st.st_ino:
+        return None
+    return (_int64(st.st_dev), _int64(st.st_ino), st.st_size, st.st_mtime_ns)
+
+class HashCache:
+    """Digests of files by (device, inode, size, mtime_ns), per algorithm
+    
+    A file that is rewritten, replaced or touched gets a new inode, size or
+    mtime, so its old entry stops matching and is replaced on the next
+    store. The change time is checked as well: it catches rewrites that
+    keep the size and restore the old mtime (as extraction does).
+    """
+    
+    def __init__(self, db_path=HASH_CACHE_DB, max_entries=HASH_CACHE_MAX_ENTRIES):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.conn = None
+        self.used = {}  # (dev, inode, algorithm) -> last use, written in batches
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    def __getstate__(self):
+        # Each worker process opens its own connection
+        state = self.__dict__.copy()
+        state['conn'] = None
+        state['used'] = {}
+        state['lock'] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def connect(self):
+        """Open the database, creating the table on first use"""
+        if self.conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(self.db_path), timeout=60, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS hashes (
+                    dev INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    algorithm TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    ctime_ns INTEGER NOT NULL,
+                    digest TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    used INTEGER NOT NULL,
+                    PRIMARY KEY (dev, inode, algorithm)
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS hashes_used ON hashes (used)")
+            self.conn.commit()
+        return self.conn
+    
+    def lookup(self, path, algorithm, st=None):
+        """Cached digest of a file, or None if unknown or the file changed since"""
+        st = st or os.stat(path)
+        key = file_key(st)
+        if key is None:
+            return None
+        dev, inode, size, mtime_ns = key
+        with self.lock:
+            row = self.connect().execute(
+                "SELECT size, mtime_ns, ctime_ns, digest FROM hashes "
+                "WHERE dev = ? AND inode = ? AND algorithm = ?", (dev, inode, algorithm)).fetchone()
+            if row is None or tuple(row[:3]) != (size, mtime_ns, st.st_ctime_ns):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.used[(dev, inode, algorithm)] = time.time_ns()
+            if len(self.used) >= 1000:
+                self.flush()
+            return row[3]
+    
+    def store(self, path, algorithm, digest, st):
+        """Remember a digest computed from the file as it was at os.stat result st
+        
+        Nothing is stored if the file changed while it was being read.
+        """
+        key = file_key(st)
+        if key is None:
+            return
+        after = os.stat(path)
+        if file_key(after) != key or after.st_ctime_ns != st.st_ctime_ns:
+            return
+        dev, inode, size, mtime_ns = key
+        with self.lock:
+            conn = self.connect()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             (dev, inode, algorithm, size, mtime_ns, st.st_ctime_ns,
+                              digest, str(path), time.time_ns()))
+    
+    def get(self, path, algorithm, compute):
+        """Cached digest, or compute(path) and remember it"""
+        st = os.stat(path)
+        digest = self.lookup(path, algorithm, st)
+        if digest is None:
+            digest = compute(path)
+            self.store(path, algorithm, digest, st)
+        return digest
+    
+    def flush(self):
+        """Write the last-use times of cache hits (caller holds the lock)"""
+        if not self.used or self.conn is None:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE hashes SET used = ? WHERE dev = ? AND inode = ? AND algorithm = ?",
+                [(used, *key) for key, used in self.used.items()])
+        self.used = {}
+    
+    def prune(self):
+        """Drop the least recently used entries beyond max_entries"""
+        conn = self.connect()
+        count = conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+        if count > self.max_entries:
+            with conn:
+                conn.execute(
+                    "DELETE FROM hashes WHERE used <= "
+                    "(SELECT used FROM hashes ORDER BY used LIMIT 1 OFFSET ?)",
+                    (count - self.max_entries - 1,))
+        return max(count - self.max_entries, 0)
+    
+    def close(self):
+        with self.lock:
+            if self.conn is None:
+                return
+            self.flush()
+            self.prune()
+            self.conn.close()
+            self.conn = None
+    
+    def clear(self):
+        with self.lock:
+            conn = self.connect()
+            with conn:
+                conn.execute("DELETE FROM hashes")
+            self.used = {}
+    
+    def summary(self):
+        """{algorithm: number of cached files}"""
+        with self.lock:
+            rows = self.connect().execute(
+                "SELECT algorithm, COUNT(*) FROM hashes GROUP BY algorithm ORDER BY algorithm")
+            return {algorithm: count for algorithm, count in rows}
+
+def main():
+    usage = ("Usage:\n"
+             "  python hash_cache.py stats\n"
+             "  python hash_cache.py clear")
+    if len(sys.argv) != 2 or sys.argv[1] not in ('stats', 'clear'):
+        print(usage)
+        sys.exit(1)
+    
+    if not HASH_CACHE_DB.exists():
+        print(f"ℹ️  No hash cache yet: {HASH_CACHE_DB}")
+        return
+    
+    with HashCache() as cache:
+        if sys.argv[1] == 'clear':
+            cache.clear()
+            print(f"✓ Hash cache cleared: {HASH_CACHE_DB}")
+            return
+        summary = cache.summary()
+        for algorithm, count in summary.items():
+            print(f"🔐 {algorithm}: {count:,} file(s)")
+        size = HASH_CACHE_DB.stat().st_size
+        print(f"\n✓ {sum(summary.values()):,} of max {HASH_CACHE_MAX_ENTRIES:,} entries "
+              f"({size / 1024**2:.1f} MB) in {HASH_CACHE_DB}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Hashing Engine - Fast file hashes for extraction and organizing
+Selectable algorithm, large reusable buffers, multi-threaded tree hash for huge files
+"""
+
+import os
+import sys
+import time
+import zlib
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Configuration
+HASH_BUFFER_SIZE = 1024 * 1024        # Bytes per read (one buffer, reused)
+TREE_CHUNK_SIZE = 64 * 1024 * 1024    # Tree hash: bytes hashed by one thread at a time
+TREE_MIN_SIZE = 256 * 1024 * 1024     # Tree hash only files at least this large
+
+# "md5" = same as md5sum (compatible), "sha1"/"sha256"/"blake2b" = which is
+# fastest depends on the CPU (run the benchmark), "crc32" = fastest, not
+# cryptographic (still fine for comparing your own files)
+ALGORITHMS = ("md5", "sha1", "sha256", "blake2b", "crc32")
+
+BENCHMARK_MB = 512  # Size of the test file written when no file is given
+
+class Crc32:
+    """zlib.crc32 with the hashlib interface"""
+    
+    name = "crc32"
+    digest_size = 4
+    
+    def __init__(self):
+        self.value = 0
+    
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+    
+    def digest(self):
+        return self.value.to_bytes(4, 'big')
+    
+    def hexdigest(self):
+        return f"{self.value:08x}"
+
+def new_hasher(algorithm):
+    """hashlib-style hasher for one of ALGORITHMS (or any hashlib name)"""
+    if algorithm == "crc32":
+        return Crc32()
+    return hashlib.new(algorithm)
+
+def hash_range(path, algorithm, offset=0, length=None, buffer_size=HASH_BUFFER_SIZE):
+    """Hasher fed with length bytes of a file from offset (None = to the end)"""
+    hasher = new_hasher(algorithm)
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        f.seek(offset)
+        remaining = length
+        while remaining is None or remaining > 0:
+            n = f.readinto(buffer if remaining is None or remaining >= buffer_size
+                           else view[:remaining])
+            if not n:
+                break
+            hasher.update(view[:n])
+            if remaining is not None:
+                remaining -= n
+    return hasher
+
+def hash_file(path, algorithm="md5", buffer_size=HASH_BUFFER_SIZE):
+    """Hex digest of a whole file, identical to md5sum/sha256sum/b2sum output"""
+    return hash_range(path, algorithm, buffer_size=buffer_size).hexdigest()
+
+def tree_hash(path, algorithm="blake2b", threads=4, chunk_size=TREE_CHUNK_SIZE,
+              buffer_size=HASH_BUFFER_SIZE):
+    """Hex digest of the file size and the digests of its chunks, hashed by several threads
+    
+    Not the same value as hash_file (or md5sum), but just as good for
+    telling whether two files are identical. Hashing releases the GIL, so
+    the threads really do run on separate cores.
+    """
+    size = os.path.getsize(path)
+    offsets = range(0, max(size, 1), chunk_size)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        leaves = pool.map(lambda offset: hash_range(path, algorithm, offset, chunk_size,
+                                                    buffer_size).digest(), offsets)
+        root = new_hasher(algorithm)
+        root.update(size.to_bytes(8, 'big'))
+        for leaf in leaves:
+            root.update(leaf)
+    return root.hexdigest()
+
+class HashEngine:
+    """Hashes files with one algorithm; files of tree_min_size and up are
+    tree hashed by several threads when threads > 1"""
+    
+    def __init__(self, algorithm="md5", threads=1, buffer_size=HASH_BUFFER_SIZE,
+                 tree_min_size=TREE_MIN_SIZE, chunk_size=TREE_CHUNK_SIZE):
+        new_hasher(algorithm)  # Fail early on an unknown algorithm
+        self.algorithm = algorithm
+        self.threads = max(1, threads)
+        self.buffer_size = buffer_size
+        self.tree_min_size = tree_min_size
+        self.chunk_size = chunk_size
+    
+    def uses_tree(self, size):
+        return self.threads > 1 and size >= self.tree_min_size
+    
+    def name(self, size):
+        """Name of the digest a file of this size gets (tree digests differ from plain ones)"""
+        if self.uses_tree(size):
+            return f"{self.algorithm}-tree{self.chunk_size // 1024**2}m"
+        return self.algorithm
+    
+    def file_hash(self, path, size=None):
+        """Hex digest of a file"""
+        if size is None:
+            size = os.path.getsize(path)
+        if self.uses_tree(size):
+            return tree_hash(path, self.algorithm, self.threads, self.chunk_size, self.buffer_size)
+        return hash_file(path, self.algorithm, self.buffer_size)
+
+def _read_all_small(path, algorithm):
+    """The old way: 8 KB reads, a new bytes object for each"""
+    hasher = new_hasher(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(8192), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def benchmark(path, threads):
+    """Print the throughput of every algorithm and read strategy on one file"""
+    size = os.path.getsize(path)
+    print(f"📄 {path} ({size / 1024**2:,.0f} MB), {threads} thread(s) for tree hashing")
+    hash_file(path, "crc32")  # Warm up the OS cache so the disk is measured only once
+    print(f"\n{'Algorithm':<10} {'8 KB reads':>12} {'1 MB readinto':>15} {'Tree hash':>12}")
+    print("-" * 52)
+    for algorithm in ALGORITHMS:
+        speeds = []
+        for run in (lambda: _read_all_small(path, algorithm),
+                    lambda: hash_file(path, algorithm),
+                    lambda: tree_hash(path, algorithm, threads)):
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            speeds.append(f"{size / 1024**2 / max(elapsed, 1e-9):,.0f} MB/s")
+        print(f"{algorithm:<10} {speeds[0]:>12} {speeds[1]:>15} {speeds[2]:>12}")
+    print("\nℹ️  The file is read from the OS cache, so this is the hashing speed;")
+    print("   a hard disk limits every column to its read speed (~100-200 MB/s).")
+
+def main():
+    usage = ("Usage:\n"
+             "  python hashing.py benchmark [file] [threads]\n"
+             "  python hashing.py <algorithm> <file> [threads]")
+    if len(sys.argv) < 2 or (sys.argv[1] != 'benchmark' and len(sys.argv) < 3):
+        print(usage)
+        sys.exit(1)
+    
+    if sys.argv[1] == 'benchmark':
+        threads = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 1
+        if len(sys.argv) > 2:
+            benchmark(sys.argv[2], threads)
+            return
+        print(f"✍️  Writing a {BENCHMARK_MB} MB test file...")
+        with tempfile.NamedTemporaryFile(suffix=".bin", delete=False) as f:
+            block = os.urandom(1024 * 1024)
+            for _ in range(BENCHMARK_MB):
+                f.write(block)
+        try:
+            benchmark(f.name, threads)
+        finally:
+            os.remove(f.name)
+        return
+    
+    algorithm, path = sys.argv[1], sys.argv[2]
+    if algorithm not in ALGORITHMS:
+        print(f"❌ Unknown algorithm: {algorithm} (choose from {', '.join(ALGORITHMS)})")
+        sys.exit(1)
+    engine = HashEngine(algorithm, int(sys.argv[3]) if len(sys.argv) > 3 else 1)
+    print(f"{engine.file_hash(path)}  {path}")
+
+if __name__ == "__main__":
+    main()
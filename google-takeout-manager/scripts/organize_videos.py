@@ -4,52 +4,278 @@ Video Mover with Hash Comparison and Blanket Options
 Set a global policy for identical files at the start
 """
 
+import io
 import os
 import shutil
-import hashlib
+import threading
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from hash_cache import HashCache
+from hashing import HashEngine, new_hasher
+
+# Duplicate check: sizes first, then a few sampled blocks, full hash only if those match
+SAMPLE_BLOCK_SIZE = 1024 * 1024  # Bytes hashed per sample (head, tail and each middle block)
+SAMPLE_COUNT = 4                 # Middle blocks, spread evenly between head and tail
+PARANOID_COMPARE = False         # True = always hash both files completely (slowest, original behavior)
+
+# Hashing: "md5" (compatible), "sha1", "sha256", "blake2b" or "crc32" (fastest, not
+# cryptographic) - "python scripts/hashing.py benchmark" shows which is fastest here
+HASH_ALGORITHM = "md5"
+HASH_THREADS = 1  # >1 = hash files of 256 MB and up with several threads (SSD recommended)
+
+# Parallel processing: several videos at once, source and destination hashed
+# at the same time. Output and statistics stay in the same order as with 1.
+# "Ask" policies always process one video at a time.
+ORGANIZE_WORKERS = 1
+
+# Remember hashes between runs (~/.takeout_hash_cache.sqlite, shared with
+# extract_takeout.py, whose CRC32s are reused when HASH_ALGORITHM = "crc32")
+USE_HASH_CACHE = True
+
+# Find duplicates by content too: a video whose content is already somewhere
+# in the destination (any name, any subfolder) follows the IDENTICAL policy
+# (skip or ask) instead of being copied again under its own name.
+CONTENT_DUPLICATES = True
+
+class DestinationIndex:
+    """Destination folder in memory, read once and updated as files arrive
+    
+    Names in the destination folder (for name clashes) with video sizes, and
+    videos anywhere below it by size (for content duplicates). Digests of
+    those videos are only calculated when a video of the same size arrives.
+    """
+    
+    def __init__(self, folder, extensions, skip_folder=None):
+        self.folder = Path(folder)
+        self.extensions = set(extensions)
+        self.skip_folder = Path(skip_folder).resolve() if skip_folder else None  # e.g. source inside destination
+        self.skip_id = None  # (device, inode) of skip_folder
+        if self.skip_folder is not None:
+            try:
+                st = os.stat(self.skip_folder)
+                self.skip_id = (st.st_dev, st.st_ino)
+            except OSError:
+                pass
+        self.names = {}    # normcase name -> size of a video (None for folders and other files)
+        self.by_size = {}  # size -> [path relative to folder] of videos, any depth
+        self.digests = {}  # (relative path, kind) -> digest
+        self.lock = threading.Lock()
+        self.scan()
+    
+    def scan(self, folder=None, relative=""):
+        """Read the folder tree once with os.scandir
+        
+        Only videos are stat()ed (through the DirEntry): other files only
+        need their name, and only at the top level.
+        """
+        if folder is None:
+            folder = self.folder
+        top = not relative
+        subfolders = []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if top:
+                            self.names[os.path.normcase(entry.name)] = None
+                        if not entry.is_symlink() and not self.is_skip_folder(entry):
+                            subfolders.append(entry)
+                        continue
+                    if os.path.splitext(entry.name)[1] not in self.extensions:
+                        if top:
+                            self.names[os.path.normcase(entry.name)] = None
+                        continue
+                    try:
+                        size = entry.stat().st_size
+                    except OSError:
+                        continue
+                    if top:
+                        self.names[os.path.normcase(entry.name)] = size
+                    self.by_size.setdefault(size, []).append(relative + entry.name)
+        except OSError:
+            return  # Unreadable folder - same as os.walk
+        for entry in subfolders:
+            self.scan(entry.path, f"{relative}{entry.name}/")
+    
+    def is_skip_folder(self, entry):
+        if self.skip_id is None or entry.inode() != self.skip_id[1]:
+            return False
+        try:
+            return entry.stat().st_dev == self.skip_id[0]
+        except OSError:
+            return False
+    
+    def __len__(self):
+        return sum(len(paths) for paths in self.by_size.values())
+    
+    def contains(self, name):
+        with self.lock:
+            return os.path.normcase(name) in self.names
+    
+    def size(self, name):
+        """Size of a file in the destination folder, or None"""
+        with self.lock:
+            return self.names.get(os.path.normcase(name))
+    
+    def candidates(self, size):
+        """Videos in the destination with this size"""
+        with self.lock:
+            return list(self.by_size.get(size, ()))
+    
+    def digest(self, relative, kind, calculate):
+        """Digest of a destination video, calculated on first use"""
+        with self.lock:
+            digest = self.digests.get((relative, kind))
+        if digest is None:
+            digest = calculate(self.folder / relative)
+            if digest is not None:
+                with self.lock:
+                    self.digests[(relative, kind)] = digest
+        return digest
+    
+    def add(self, name, size):
+        """A file was written to the destination folder (replacing any old one)"""
+        key = os.path.normcase(name)
+        with self.lock:
+            old_size = self.names.get(key)
+            if old_size is not None:
+                paths = self.by_size.get(old_size, [])
+                for path in [p for p in paths if os.path.normcase(p) == key]:
+                    paths.remove(path)
+                    for kind in ('sample', 'full'):
+                        self.digests.pop((path, kind), None)
+            self.names[key] = size
+            if Path(name).suffix in self.extensions:
+                self.by_size.setdefault(size, []).append(name)
 
 class VideoMoverWithBlanketOptions:
-    def __init__(self, source_folder, dest_folder, mode="move"):
+    def __init__(self, source_folder, dest_folder, mode="move", paranoid=PARANOID_COMPARE,
+                 hash_cache=USE_HASH_CACHE, algorithm=HASH_ALGORITHM, hash_threads=HASH_THREADS,
+                 workers=ORGANIZE_WORKERS, content_duplicates=CONTENT_DUPLICATES):
         self.source_folder = Path(source_folder)
         self.dest_folder = Path(dest_folder)
         self.mode = mode  # "move" or "copy"
+        self.paranoid = paranoid
+        self.engine = HashEngine(algorithm, hash_threads)
+        self.hash_cache = HashCache() if hash_cache else None
+        self.workers = max(1, workers)
+        self.hash_pool = None   # Hashes the destination while the caller hashes the source
+        self.interactive = True  # False while workers run: never prompt from a worker
+        self.local = threading.local()  # Per-thread log buffer of the video being processed
+        self.rename_lock = threading.Lock()
+        self.claimed = set()  # Destination names (normcase) taken by this run
+        self.content_duplicates = content_duplicates
+        self.index = None  # DestinationIndex, built on first use
         self.video_extensions = ['.mp4', '.mov', '.MP4', '.MOV']
-        self.stats = {
+        self.stats = self.new_stats()
+        # Blanket policies
+        self.identical_policy = None  # "skip", "rename", "overwrite", "ask"
+        self.different_policy = None  # "skip", "rename", "overwrite", "ask"
+    
+    @staticmethod
+    def new_stats():
+        """Empty statistics dictionary"""
+        return {
             'found': 0,
             'moved': 0,
             'skipped': 0,
             'renamed': 0,
             'overwritten': 0,
+            'same_content': 0,
             'errors': []
         }
-        # Blanket policies
-        self.identical_policy = None  # "skip", "rename", "overwrite", "ask"
-        self.different_policy = None  # "skip", "rename", "overwrite", "ask"
+    
+    def merge_stats(self, stats):
+        """Add the statistics of one video into self.stats"""
+        for key, value in stats.items():
+            if isinstance(value, list):
+                self.stats[key].extend(value)
+            else:
+                self.stats[key] += value
+    
+    def say(self, *args, **kwargs):
+        """print(), into the current video's log when it runs in a worker"""
+        print(*args, file=getattr(self.local, 'buffer', None), **kwargs)
+    
+    def hash_pair(self, hash_function, source_path, dest_path):
+        """hash_function of source and destination, both at once if a hash pool is running"""
+        if self.hash_pool is None:
+            return hash_function(source_path), hash_function(dest_path)
+        
+        def in_pool(path):
+            self.local.buffer = io.StringIO()
+            try:
+                return hash_function(path), self.local.buffer.getvalue()
+            finally:
+                self.local.buffer = None
+        
+        future = self.hash_pool.submit(in_pool, dest_path)
+        source_hash = hash_function(source_path)
+        dest_hash, dest_log = future.result()
+        self.say(dest_log, end='')  # Same order as hashing one after the other
+        return source_hash, dest_hash
     
     def calculate_hash(self, filepath, show_progress=False):
-        """Calculate MD5 hash of a file"""
-        hash_md5 = hashlib.md5()
+        """Calculate the hash of a file (HASH_ALGORITHM)"""
         filename = os.path.basename(filepath)
         
+        try:
+            file_stat = os.stat(filepath)
+            digest_name = self.engine.name(file_stat.st_size)
+            if self.hash_cache is not None:
+                cached = self.hash_cache.lookup(filepath, digest_name, file_stat)
+                if cached is not None:
+                    if show_progress:
+                        self.say(f"      Hash from cache: {filename} ✓")
+                    return cached
+        except Exception as e:
+            if show_progress:
+                self.say(f"      ❌ Error: {filename}: {e}")
+            return None
+        
         if show_progress:
-            file_size = os.path.getsize(filepath)
-            size_str = self.format_size(file_size)
-            print(f"      Calculating hash: {filename} ({size_str})... ", end='', flush=True)
+            size_str = self.format_size(file_stat.st_size)
+            self.say(f"      Calculating hash: {filename} ({size_str})... ", end='', flush=True)
         
         try:
-            with open(filepath, 'rb') as f:
-                for chunk in iter(lambda: f.read(8192), b''):
-                    hash_md5.update(chunk)
-            
-            hash_value = hash_md5.hexdigest()
+            hash_value = self.engine.file_hash(filepath, file_stat.st_size)
+            if self.hash_cache is not None:
+                self.hash_cache.store(filepath, digest_name, hash_value, file_stat)
             if show_progress:
-                print(f"✓")
+                self.say(f"✓")
             return hash_value
         except Exception as e:
             if show_progress:
-                print(f"❌ Error: {e}")
+                self.say(f"❌ Error: {e}")
+            return None
+    
+    def calculate_sample_hash(self, filepath, file_size):
+        """Hash of the head, tail and SAMPLE_COUNT evenly spaced middle blocks"""
+        hasher = new_hasher(self.engine.algorithm)
+        last = max(file_size - SAMPLE_BLOCK_SIZE, 0)
+        offsets = [0] + [last * k // (SAMPLE_COUNT + 1) for k in range(1, SAMPLE_COUNT + 1)] + [last]
+        algorithm = f"{self.engine.algorithm}-sample-{SAMPLE_COUNT}x{SAMPLE_BLOCK_SIZE}"
+        try:
+            file_stat = os.stat(filepath)
+            if self.hash_cache is not None:
+                cached = self.hash_cache.lookup(filepath, algorithm, file_stat)
+                if cached is not None:
+                    return cached
+            with open(filepath, 'rb') as f:
+                for offset in offsets:
+                    f.seek(offset)
+                    hasher.update(f.read(SAMPLE_BLOCK_SIZE))
+            hash_value = hasher.hexdigest()
+            if self.hash_cache is not None:
+                self.hash_cache.store(filepath, algorithm, hash_value, file_stat)
+            return hash_value
+        except Exception:
             return None
     
     def format_size(self, size_bytes):
@@ -139,47 +365,65 @@ class VideoMoverWithBlanketOptions:
         print("=" * 70 + "\n")
     
     def compare_files(self, source_path, dest_path):
-        """Compare two files and return decision based on policy"""
+        """Compare two files and return decision based on policy
+        
+        Different sizes are different files. Equal sizes compare sampled
+        blocks first; both files are only hashed completely when the samples
+        match (or always, in paranoid mode).
+        """
         source_name = os.path.basename(source_path)
         source_size = os.path.getsize(source_path)
         dest_size = os.path.getsize(dest_path)
         
-        print(f"\n      ⚠️  Duplicate filename: {source_name}")
-        print(f"      Size - Source: {self.format_size(source_size)} | Dest: {self.format_size(dest_size)}")
+        self.say(f"\n      ⚠️  Duplicate filename: {source_name}")
+        self.say(f"      Size - Source: {self.format_size(source_size)} | Dest: {self.format_size(dest_size)}")
+        
+        if not self.paranoid:
+            if source_size != dest_size:
+                self.say(f"      ⚠️  DIFFERENT (sizes differ)")
+                return self.apply_policy(source_name, "different", None, None)
+            
+            # Files that fit in the samples are hashed completely anyway
+            if source_size > (SAMPLE_COUNT + 2) * SAMPLE_BLOCK_SIZE:
+                self.say(f"      🔍 Comparing sampled blocks...")
+                source_sample, dest_sample = self.hash_pair(
+                    lambda path: self.calculate_sample_hash(path, source_size), source_path, dest_path)
+                if source_sample is not None and dest_sample is not None and source_sample != dest_sample:
+                    self.say(f"      ⚠️  DIFFERENT (sampled blocks differ)")
+                    return self.apply_policy(source_name, "different", None, None)
         
         # Calculate hashes
-        print(f"      🔍 Calculating hashes...")
-        source_hash = self.calculate_hash(source_path, show_progress=True)
-        dest_hash = self.calculate_hash(dest_path, show_progress=True)
+        self.say(f"      🔍 Calculating hashes...")
+        source_hash, dest_hash = self.hash_pair(
+            lambda path: self.calculate_hash(path, show_progress=True), source_path, dest_path)
         
         if source_hash is None or dest_hash is None:
-            print(f"      ❌ Error calculating hashes")
+            self.say(f"      ❌ Error calculating hashes")
+            if not self.interactive:
+                self.say(f"      → Skipped (cannot ask while processing in parallel)")
+                return "skip"
             return self.ask_user_decision(source_name, "error", source_hash, dest_hash)
         
         # Show hash comparison
-        print(f"\n      🔐 HASH COMPARISON:")
-        print(f"         Source: {source_hash}")
-        print(f"         Dest:   {dest_hash}")
+        self.say(f"\n      🔐 HASH COMPARISON:")
+        self.say(f"         Source: {source_hash}")
+        self.say(f"         Dest:   {dest_hash}")
         
         # Determine if identical or different
         if source_hash == dest_hash:
-            print(f"      ✅ IDENTICAL (hashes match)")
-            
-            # Apply policy
-            if self.identical_policy == "ask":
-                return self.ask_user_decision(source_name, "identical", source_hash, dest_hash)
-            else:
-                print(f"      → Policy: {self.identical_policy.upper()}")
-                return self.identical_policy
+            self.say(f"      ✅ IDENTICAL (hashes match)")
+            return self.apply_policy(source_name, "identical", source_hash, dest_hash)
         else:
-            print(f"      ⚠️  DIFFERENT (hashes differ)")
-            
-            # Apply policy
-            if self.different_policy == "ask":
-                return self.ask_user_decision(source_name, "different", source_hash, dest_hash)
-            else:
-                print(f"      → Policy: {self.different_policy.upper()}")
-                return self.different_policy
+            self.say(f"      ⚠️  DIFFERENT (hashes differ)")
+            return self.apply_policy(source_name, "different", source_hash, dest_hash)
+    
+    def apply_policy(self, source_name, file_status, source_hash, dest_hash):
+        """Blanket policy for "identical" or "different" files (asks if set to ask)"""
+        policy = self.identical_policy if file_status == "identical" else self.different_policy
+        if policy == "ask":
+            return self.ask_user_decision(source_name, file_status, source_hash, dest_hash)
+        self.say(f"      → Policy: {policy.upper()}")
+        return policy
     
     def ask_user_decision(self, filename, file_status, source_hash, dest_hash):
         """Ask user what to do with this specific file"""
@@ -214,16 +458,24 @@ class VideoMoverWithBlanketOptions:
                 print("      Invalid choice. Please enter s, r, or o")
     
     def get_renamed_path(self, dest_path):
-        """Get a unique filename with _copy suffix"""
+        """Get a unique filename with _copy suffix
+        
+        The name is claimed under a lock, so two workers never get the same one.
+        """
         stem = dest_path.stem
         suffix = dest_path.suffix
         parent = dest_path.parent
         counter = 1
         
-        new_path = parent / f"{stem}_copy{counter}{suffix}"
-        while new_path.exists():
-            counter += 1
+        index = self.destination_index()
+        with self.rename_lock:
             new_path = parent / f"{stem}_copy{counter}{suffix}"
+            # exists() only double-checks names the index does not know
+            while (index.contains(new_path.name) or os.path.normcase(new_path.name) in self.claimed
+                   or new_path.exists()):
+                counter += 1
+                new_path = parent / f"{stem}_copy{counter}{suffix}"
+            self.claimed.add(os.path.normcase(new_path.name))
         
         return new_path
     
@@ -240,29 +492,92 @@ class VideoMoverWithBlanketOptions:
         
         return videos
     
-    def move_video(self, video_path):
-        """Move or copy a single video file"""
+    def destination_index(self):
+        if self.index is None:
+            self.index = DestinationIndex(self.dest_folder, self.video_extensions, self.source_folder)
+        return self.index
+    
+    def find_same_content(self, video_path, size, exclude=None):
+        """A video anywhere in the destination with the same content, or None
+        
+        Same size first, then sampled blocks, then the full hash, like compare_files.
+        """
+        index = self.destination_index()
+        candidates = [c for c in index.candidates(size)
+                      if exclude is None or os.path.normcase(c) != os.path.normcase(exclude)]
+        source_sample = source_hash = None
+        for relative in candidates:
+            if not self.paranoid and size > (SAMPLE_COUNT + 2) * SAMPLE_BLOCK_SIZE:
+                if source_sample is None:
+                    source_sample = self.calculate_sample_hash(video_path, size)
+                dest_sample = index.digest(relative, 'sample',
+                                           lambda path: self.calculate_sample_hash(path, size))
+                if source_sample is not None and dest_sample is not None and source_sample != dest_sample:
+                    continue
+            if source_hash is None:
+                source_hash = self.calculate_hash(video_path, show_progress=True)
+                if source_hash is None:
+                    return None
+            if index.digest(relative, 'full',
+                            lambda path: self.calculate_hash(path, show_progress=True)) == source_hash:
+                return relative
+        return None
+    
+    def same_content_decision(self, video_path, size, exclude=None):
+        """'skip' if the video's content is already in the destination and the policy says so"""
+        if not self.content_duplicates:
+            return None
+        match = self.find_same_content(video_path, size, exclude)
+        if match is None:
+            return None
+        self.say(f"\n      ♻️  Same content already in destination: {match}")
+        if self.identical_policy == "ask":
+            decision = self.ask_user_decision(video_path.name, "identical", None, None)
+        else:
+            self.say(f"      → Policy: {self.identical_policy.upper()}")
+            decision = self.identical_policy
+        if decision != "skip":
+            self.say(f"      → Keeping both (different names)")
+        return decision
+    
+    def move_video(self, video_path, stats=None):
+        """Move or copy a single video file (counted in stats, default self.stats)"""
+        stats = self.stats if stats is None else stats
         try:
             filename = video_path.name
             dest_path = self.dest_folder / filename
+            size = video_path.stat().st_size
+            index = self.destination_index()
             
             # Check if file already exists
-            if dest_path.exists():
+            if index.contains(filename):
                 # Compare files and get decision based on policy
                 decision = self.compare_files(video_path, dest_path)
                 
+                # About to be added under a new name - it may exist under another one
+                if decision == 'rename' and self.same_content_decision(
+                        video_path, size, exclude=filename) == 'skip':
+                    stats['skipped'] += 1
+                    stats['same_content'] += 1
+                    return 'skipped', filename
+                
                 if decision == 'skip':
-                    self.stats['skipped'] += 1
+                    stats['skipped'] += 1
                     return 'skipped', filename
                 
                 elif decision == 'rename':
                     dest_path = self.get_renamed_path(dest_path)
-                    self.stats['renamed'] += 1
+                    stats['renamed'] += 1
                     
                 elif decision == 'overwrite':
                     # Delete existing file first
                     dest_path.unlink()
-                    self.stats['overwritten'] += 1
+                    stats['overwritten'] += 1
+            
+            elif self.same_content_decision(video_path, size) == 'skip':
+                stats['skipped'] += 1
+                stats['same_content'] += 1
+                return 'skipped', filename
             
             # Move or copy the file
             if self.mode == "move":
@@ -271,14 +586,118 @@ class VideoMoverWithBlanketOptions:
             else:  # copy
                 shutil.copy2(str(video_path), str(dest_path))
                 action = 'copied'
+            index.add(dest_path.name, size)
             
-            self.stats['moved'] += 1
+            stats['moved'] += 1
             return action, dest_path.name
             
         except Exception as e:
-            self.stats['errors'].append(f"{video_path.name}: {str(e)}")
+            stats['errors'].append(f"{video_path.name}: {str(e)}")
             return 'error', str(e)
     
+    def report(self, status, info):
+        """Result line of one processed video"""
+        if status == 'moved':
+            print(f"      ✅ Moved to: {info}")
+        elif status == 'copied':
+            print(f"      ✅ Copied to: {info}")
+        elif status == 'skipped':
+            print(f"      ⏭️  Skipped")
+        elif status == 'error':
+            print(f"      ❌ Error: {info}")
+    
+    def process_serially(self, videos):
+        """Process videos one after the other"""
+        for i, video in enumerate(videos, 1):
+            rel_path = video.relative_to(self.source_folder)
+            print(f"\n[{i:3d}/{len(videos)}] {rel_path}")
+            
+            status, info = self.move_video(video)
+            self.report(status, info)
+    
+    def process_group(self, group):
+        """Process videos with the same name, in order, each with its own log and stats"""
+        results = []
+        for i, video in group:
+            self.local.buffer = io.StringIO()
+            stats = self.new_stats()
+            try:
+                status, info = self.move_video(video, stats)
+            finally:
+                log = self.local.buffer.getvalue()
+                self.local.buffer = None
+            results.append((i, log, stats, status, info))
+        return results
+    
+    def group_videos(self, videos):
+        """Videos that may affect each other's outcome, each group in original order
+        
+        Videos with the same name are compared with each other. With content
+        duplicates on, so are videos with the same size, and a video with the
+        size of a destination file another video may replace or rename.
+        """
+        index = self.destination_index()
+        parent = list(range(len(videos)))
+        
+        def root(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        first = {}  # key -> first video with it
+        for i, video in enumerate(videos):
+            keys = [('name', os.path.normcase(video.name))]
+            if self.content_duplicates:
+                keys.append(('size', video.stat().st_size))
+                existing = index.size(video.name)
+                if existing is not None:
+                    keys.append(('size', existing))
+            for key in keys:
+                if key in first:
+                    parent[root(i)] = root(first[key])
+                else:
+                    first[key] = i
+        
+        groups = {}
+        for i, video in enumerate(videos):
+            groups.setdefault(root(i), []).append((i + 1, video))
+        return groups
+    
+    def process_concurrently(self, videos):
+        """Process videos in a pool of workers
+        
+        Videos that may be compared with each other (same name or size) go
+        to the same worker in their original order (see group_videos).
+        Every video's name is claimed up front, so a rename never takes a
+        name another worker is about to write. Logs and statistics are
+        printed and added up in the original order.
+        """
+        groups = self.group_videos(videos)
+        self.claimed.update(os.path.normcase(video.name) for video in videos)
+        
+        self.interactive = False
+        results = {}
+        next_index = 1
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(self.process_group, group) for group in groups.values()]
+                for future in as_completed(futures):
+                    for i, log, stats, status, info in future.result():
+                        results[i] = (log, stats, status, info)
+                    
+                    # Print everything that is next in line
+                    while next_index in results:
+                        log, stats, status, info = results.pop(next_index)
+                        video = videos[next_index - 1]
+                        print(f"\n[{next_index:3d}/{len(videos)}] {video.relative_to(self.source_folder)}")
+                        print(log, end='')
+                        self.merge_stats(stats)
+                        self.report(status, info)
+                        next_index += 1
+        finally:
+            self.interactive = True
+    
     def run(self):
         """Main process"""
         print("="*70)
@@ -288,6 +707,8 @@ class VideoMoverWithBlanketOptions:
         print(f"📂 Destination: {self.dest_folder}")
         print(f"🎯 Extensions: {', '.join(self.video_extensions)}")
         print(f"⚙️  Mode: {self.mode.upper()}")
+        if self.workers > 1:
+            print(f"⚡ Workers: {self.workers}")
         
         # Validate folders
         if not self.source_folder.exists():
@@ -297,6 +718,10 @@ class VideoMoverWithBlanketOptions:
         # Create destination folder
         self.dest_folder.mkdir(parents=True, exist_ok=True)
         
+        # Read the destination once
+        print(f"\n📇 Indexing destination folder...")
+        print(f"✓ {len(self.destination_index())} video(s) already in destination")
+        
         # Find videos
         videos = self.find_videos()
         self.stats['found'] = len(videos)
@@ -339,20 +764,22 @@ class VideoMoverWithBlanketOptions:
         
         start_time = datetime.now()
         
-        for i, video in enumerate(videos, 1):
-            rel_path = video.relative_to(self.source_folder)
-            print(f"\n[{i:3d}/{len(videos)}] {rel_path}")
-            
-            status, info = self.move_video(video)
-            
-            if status == 'moved':
-                print(f"      ✅ Moved to: {info}")
-            elif status == 'copied':
-                print(f"      ✅ Copied to: {info}")
-            elif status == 'skipped':
-                print(f"      ⏭️  Skipped")
-            elif status == 'error':
-                print(f"      ❌ Error: {info}")
+        if self.workers > 1:
+            self.hash_pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            if self.workers > 1 and "ask" not in (self.identical_policy, self.different_policy):
+                self.process_concurrently(videos)
+            else:
+                if self.workers > 1:
+                    print("ℹ️  'Ask' policy: one video at a time (hashes still in parallel)")
+                self.process_serially(videos)
+        finally:
+            if self.hash_pool is not None:
+                self.hash_pool.shutdown()
+                self.hash_pool = None
+        
+        if self.hash_cache is not None:
+            self.hash_cache.close()
         
         # Summary
         elapsed = (datetime.now() - start_time).total_seconds()
@@ -364,6 +791,10 @@ class VideoMoverWithBlanketOptions:
         print(f"✅ Processed: {self.stats['moved']} files")
         print(f"⏭️  Skipped: {self.stats['skipped']} files")
         print(f"📝 Renamed: {self.stats['renamed']} files")
+        if self.stats['same_content'] > 0:
+            print(f"♻️  Same content under another name: {self.stats['same_content']} files (skipped)")
+        if self.hash_cache is not None and self.hash_cache.hits:
+            print(f"🔐 Hashes from cache: {self.hash_cache.hits}")
         if self.stats['overwritten'] > 0:
             print(f"🔄 Overwritten: {self.stats['overwritten']} files")
         
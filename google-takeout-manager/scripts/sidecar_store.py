@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Google Takeout Sidecar Store - Photo metadata in one database
+Keeps the .json file Google Photos adds next to every photo in SQLite
+"""
+
+import sys
+import json
+import sqlite3
+from pathlib import Path
+from datetime import datetime
+
+# Configuration
+SIDECAR_DB = r"E:\Takeout\takeout_sidecars.sqlite"  # Created by extract_takeout.py
+
+# Folders under Takeout/ whose .json sidecars are stored (name depends on the export language)
+SIDECAR_SERVICES = ["Google Photos", "Google Fotos"]
+
+SUPPLEMENTAL = "supplemental-metadata"  # Newer exports: IMG_1234.jpg.supplemental-metadata.json
+
+def media_name_for(sidecar_name):
+    """Media file name a sidecar describes, or None if it is not a sidecar
+    
+    IMG_1234.jpg.json -> IMG_1234.jpg
+    IMG_1234.jpg.supplemental-metadata.json (or a cut-off .supplemental-me.json) -> IMG_1234.jpg
+    IMG_1234.jpg(1).json -> IMG_1234(1).jpg
+    metadata.json (album information) -> None
+    """
+    if not sidecar_name.lower().endswith('.json'):
+        return None
+    name = sidecar_name[:-5]
+    
+    counter = ""
+    if name.endswith(')') and '(' in name:
+        base, _, number = name[:-1].rpartition('(')
+        if number.isdigit():
+            name, counter = base, f"({number})"
+    
+    # Long names are cut off by Takeout, including this suffix
+    stem, dot, last = name.rpartition('.')
+    if dot and '.' in stem and SUPPLEMENTAL.startswith(last.lower()):
+        name = stem
+    
+    stem, dot, extension = name.rpartition('.')
+    if not dot or not stem:
+        return None
+    return f"{stem}{counter}.{extension}"
+
+def is_sidecar(member_name, services=SIDECAR_SERVICES):
+    """Whether a path inside the ZIP is a Google Photos sidecar"""
+    parts = member_name.split('/')
+    return (len(parts) > 2 and parts[1] in services
+            and media_name_for(parts[-1]) is not None)
+
+def photo_taken_time(meta):
+    """Unix time a photo was taken (photoTakenTime, else creationTime), or None"""
+    if not isinstance(meta, dict):
+        return None
+    taken = (meta.get('photoTakenTime') or meta.get('creationTime') or {}).get('timestamp')
+    return int(taken) if taken else None
+
+def _timestamp(value):
+    """Unix time from a datetime, a date string (YYYY-MM-DD) or a number"""
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, str):
+        return int(datetime.fromisoformat(value).timestamp())
+    return int(value)
+
+class SidecarStore:
+    """SQLite store of sidecars, keyed by the media file's path inside the ZIP
+    
+    Rows are added in batches during extraction; date, location and album
+    queries use indexes instead of walking folders and parsing files.
+    """
+    
+    def __init__(self, db_path, batch_size=1000):
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self.conn = None
+        self.pending = []
+    
+    def __getstate__(self):
+        # Each worker process opens its own connection
+        state = self.__dict__.copy()
+        state['conn'] = None
+        state['pending'] = []
+        return state
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def connect(self):
+        """Open the database, creating the table and indexes on first use"""
+        if self.conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(self.db_path), timeout=60)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS sidecars (
+                    media_path TEXT PRIMARY KEY,
+                    sidecar_path TEXT NOT NULL,
+                    album TEXT NOT NULL,
+                    title TEXT,
+                    taken INTEGER,
+                    latitude REAL,
+                    longitude REAL,
+                    json TEXT NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS sidecars_taken ON sidecars (taken)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS sidecars_location ON sidecars (latitude, longitude)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS sidecars_album ON sidecars (album)")
+            self.conn.commit()
+        return self.conn
+    
+    def add(self, sidecar_path, data):
+        """Queue one sidecar (its path inside the ZIP and raw bytes)"""
+        folder, _, name = sidecar_path.rpartition('/')
+        media_path = f"{folder}/{media_name_for(name)}"
+        text = data.decode('utf-8', errors='replace')
+        
+        title = taken = latitude = longitude = None
+        try:
+            meta = json.loads(text)
+        except ValueError:
+            meta = None  # Kept as text, just not searchable
+        if isinstance(meta, dict):
+            title = meta.get('title')
+            taken = photo_taken_time(meta)
+            # 0, 0 means "no location"; the EXIF copy is sometimes the only one set
+            for key in ('geoData', 'geoDataExif'):
+                geo = meta.get(key) or {}
+                if geo.get('latitude') or geo.get('longitude'):
+                    latitude, longitude = geo['latitude'], geo['longitude']
+                    break
+        
+        self.pending.append((media_path, sidecar_path, folder.rsplit('/', 1)[-1],
+                             title, taken, latitude, longitude, text))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """Commit queued sidecars in one transaction"""
+        if not self.pending:
+            return
+        conn = self.connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO sidecars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self.pending)
+        self.pending = []
+    
+    def close(self):
+        self.flush()
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+    
+    def query(self, where="1", params=()):
+        """Rows as dicts, oldest first"""
+        self.flush()
+        rows = self.connect().execute(
+            f"SELECT * FROM sidecars WHERE {where} ORDER BY taken, media_path", params)
+        return [dict(row) for row in rows]
+    
+    def get(self, media_path):
+        """Parsed sidecar of one media file, or None"""
+        rows = self.query("media_path = ?", (media_path,))
+        return json.loads(rows[0]['json']) if rows else None
+    
+    def taken_between(self, start, end):
+        """Photos taken from start up to (not including) end"""
+        return self.query("taken >= ? AND taken < ?", (_timestamp(start), _timestamp(end)))
+    
+    def in_area(self, south, west, north, east):
+        """Photos inside a latitude/longitude box (west > east crosses the date line)"""
+        if west <= east:
+            return self.query("latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?",
+                              (south, north, west, east))
+        return self.query("latitude BETWEEN ? AND ? AND (longitude >= ? OR longitude <= ?)",
+                          (south, north, west, east))
+    
+    def in_album(self, album):
+        """Photos in one album (or year folder, e.g. "Photos from 2023")"""
+        return self.query("album = ?", (album,))
+    
+    def albums(self):
+        """{album: number of photos}"""
+        self.flush()
+        rows = self.connect().execute(
+            "SELECT album, COUNT(*) FROM sidecars GROUP BY album ORDER BY album")
+        return {album: count for album, count in rows}
+
+def main():
+    usage = ("Usage:\n"
+             "  python sidecar_store.py albums\n"
+             "  python sidecar_store.py album \"Trip to Paris\"\n"
+             "  python sidecar_store.py date 2023-06-01 2023-07-01\n"
+             "  python sidecar_store.py area <south> <west> <north> <east>\n"
+             "  python sidecar_store.py show \"Takeout/Google Photos/Trip/IMG_1234.jpg\"")
+    commands = {'albums': 0, 'album': 1, 'date': 2, 'area': 4, 'show': 1}
+    if len(sys.argv) < 2 or len(sys.argv) - 2 != commands.get(sys.argv[1]):
+        print(usage)
+        sys.exit(1)
+    
+    if not Path(SIDECAR_DB).exists():
+        print(f"❌ Sidecar store not found: {SIDECAR_DB}")
+        print("   Extract with SIDECAR_STORE = True first")
+        sys.exit(1)
+    
+    command, args = sys.argv[1], sys.argv[2:]
+    with SidecarStore(SIDECAR_DB) as store:
+        if command == 'albums':
+            for album, count in store.albums().items():
+                print(f"📁 {album} ({count:,})")
+            return
+        if command == 'show':
+            meta = store.get(args[0])
+            if meta is None:
+                print(f"❌ No sidecar for {args[0]}")
+                sys.exit(1)
+            print(json.dumps(meta, indent=2, ensure_ascii=False))
+            return
+        
+        if command == 'album':
+            rows = store.in_album(args[0])
+        elif command == 'date':
+            rows = store.taken_between(args[0], args[1])
+        else:
+            rows = store.in_area(*(float(a) for a in args))
+        
+        for row in rows:
+            taken = datetime.fromtimestamp(row['taken']).strftime('%Y-%m-%d %H:%M') if row['taken'] else "unknown date"
+            place = f" 📍 {row['latitude']:.4f}, {row['longitude']:.4f}" if row['latitude'] is not None else ""
+            print(f"{taken}  {row['media_path']}{place}")
+        print(f"\n✓ {len(rows):,} photo(s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Google Takeout Virtual View - Read files without extracting
+One merged, read-only folder tree over all Takeout ZIP parts
+"""
+
+import sys
+import shutil
+import zipfile
+import threading
+from pathlib import Path
+from datetime import datetime
+from collections import OrderedDict, namedtuple
+
+from extract_takeout import (TakeoutExtractor, CollisionPlanner, MemberIndex,
+                             ZIP_FOLDER, DUPLICATE_MODE, MEMBER_INDEX_FILE)
+
+ViewStat = namedtuple('ViewStat', ['size', 'mtime', 'is_dir', 'part', 'crc'])
+
+class VirtualPlanner(CollisionPlanner):
+    """CollisionPlanner for an output folder that starts empty and is never read"""
+    
+    def read_listing(self, directory):
+        return {}
+
+class TakeoutView:
+    """Merged view over all ZIP parts, with listdir/stat/open
+    
+    The central directories of all parts are read once and cached next to
+    the ZIPs. Files that exist in several parts are merged with the same
+    rules as extraction (duplicate_mode), so the view shows what
+    extract_takeout.py would produce in an empty output folder.
+    """
+    
+    def __init__(self, zip_folder=ZIP_FOLDER, duplicate_mode="skip", cache_path=None, max_open=8):
+        self.zip_folder = Path(zip_folder)
+        self.duplicate_mode = duplicate_mode
+        self.cache_path = Path(cache_path) if cache_path else self.zip_folder / MEMBER_INDEX_FILE
+        self.max_open = max(1, max_open)
+        self.parts = TakeoutExtractor(zip_folder, zip_folder, duplicate_mode).find_zip_files()
+        self.index = None
+        self.dirs = {}  # "Takeout/Google Photos" -> {child name: index position, None for a folder}
+        self.handles = OrderedDict()  # part number -> open ZipFile, least recently used first
+        self.lock = threading.Lock()
+        self.load()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def load(self):
+        """Open the cached index (rebuilt if a ZIP changed) and merge the parts"""
+        self.index = MemberIndex.open(self.parts, self.cache_path)
+        self.build_tree()
+    
+    def build_tree(self):
+        """Merge all parts with the extraction rules"""
+        planner = VirtualPlanner(Path('.'), self.duplicate_mode, None,
+                                 lambda m: (Path(m.filename), None), self.index)
+        for i in range(len(self.index)):
+            planner.add(i, self.index.member(i))
+        
+        self.dirs = {'': {}}
+        for i in range(len(self.index)):
+            action, counter = planner.decision(i)
+            if action in ("skipped", "superseded"):
+                continue
+            path = self.index.name(i)
+            if action == "renamed":
+                path = CollisionPlanner.copy_path(Path(path), counter).as_posix()
+            parent, _, name = path.rpartition('/')
+            self.dirs.setdefault(parent, {})[name] = i
+            
+            # Register every parent folder
+            child = parent
+            while child:
+                parent, _, name = child.rpartition('/')
+                siblings = self.dirs.setdefault(parent, {})
+                if name in siblings:
+                    break
+                siblings[name] = None
+                child = parent
+    
+    @staticmethod
+    def normalize(path):
+        return str(path).replace('\\', '/').strip('/')
+    
+    def position(self, path):
+        """Index position of a file in the merged tree, or None"""
+        parent, _, name = self.normalize(path).rpartition('/')
+        return self.dirs.get(parent, {}).get(name)
+    
+    def exists(self, path):
+        return self.position(path) is not None or self.isdir(path)
+    
+    def isdir(self, path):
+        return self.normalize(path) in self.dirs
+    
+    def listdir(self, path=''):
+        """Names in a folder of the merged tree"""
+        path = self.normalize(path)
+        if path not in self.dirs:
+            raise FileNotFoundError(f"No such folder in Takeout: {path!r}")
+        return sorted(self.dirs[path])
+    
+    def walk(self, top=''):
+        """Like os.walk: yields (folder, subfolders, files)"""
+        top = self.normalize(top)
+        names = self.listdir(top)
+        prefix = top + '/' if top else ''
+        subdirs = [n for n in names if prefix + n in self.dirs]
+        files = [n for n in names if self.dirs[top][n] is not None]
+        yield top, subdirs, files
+        for name in subdirs:
+            yield from self.walk(prefix + name)
+    
+    def stat(self, path):
+        i = self.position(path)
+        if i is not None:
+            info = self.index.member(i)
+            mtime = datetime(*info.date_time).timestamp()
+            part = self.parts[self.index.columns['part'][i]]
+            return ViewStat(info.file_size, mtime, False, part.name, info.CRC)
+        if self.isdir(path):
+            return ViewStat(0, None, True, None, None)
+        raise FileNotFoundError(f"No such file in Takeout: {self.normalize(path)!r}")
+    
+    def get_zip(self, number):
+        """Open ZipFile for a part, keeping at most max_open handles"""
+        with self.lock:
+            zf = self.handles.pop(number, None)
+            if zf is None:
+                zf = zipfile.ZipFile(self.parts[number], 'r')
+            self.handles[number] = zf
+            while len(self.handles) > self.max_open:
+                _, oldest = self.handles.popitem(last=False)
+                oldest.close()  # Streams already opened from it stay readable
+            return zf
+    
+    def open(self, path):
+        """Binary file object streaming the file straight from its ZIP"""
+        i = self.position(path)
+        if i is None:
+            raise FileNotFoundError(f"No such file in Takeout: {self.normalize(path)!r}")
+        return self.get_zip(self.index.columns['part'][i]).open(self.index.member(i))
+    
+    def read_bytes(self, path):
+        with self.open(path) as f:
+            return f.read()
+    
+    def close(self):
+        with self.lock:
+            for zf in self.handles.values():
+                zf.close()
+            self.handles.clear()
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+
+def main():
+    usage = ("Usage:\n"
+             "  python takeout_view.py ls [folder]\n"
+             "  python takeout_view.py stat <file>\n"
+             "  python takeout_view.py cat <file> > output")
+    if len(sys.argv) < 2 or sys.argv[1] not in ('ls', 'stat', 'cat'):
+        print(usage)
+        sys.exit(1)
+    
+    command = sys.argv[1]
+    path = sys.argv[2] if len(sys.argv) > 2 else ''
+    
+    with TakeoutView(ZIP_FOLDER, DUPLICATE_MODE) as view:
+        try:
+            if command == 'ls':
+                for name in view.listdir(path):
+                    full = f"{view.normalize(path)}/{name}".strip('/')
+                    if view.isdir(full):
+                        print(f"📁 {name}/")
+                    else:
+                        print(f"📄 {name} ({view.stat(full).size:,} bytes)")
+            elif command == 'stat':
+                st = view.stat(path)
+                print(f"Size: {st.size:,} bytes")
+                if not st.is_dir:
+                    print(f"Modified: {datetime.fromtimestamp(st.mtime)}")
+                    print(f"CRC32: {st.crc:08x}")
+                    print(f"ZIP: {st.part}")
+            else:
+                with view.open(path) as f:
+                    shutil.copyfileobj(f, sys.stdout.buffer)
+        except FileNotFoundError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()